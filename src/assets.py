@@ -0,0 +1,69 @@
+import os
+import pygame
+from collections import OrderedDict
+from constants import *
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
+
+def surface_bytes(surface):
+    width, height = surface.get_size()
+    return width * height * surface.get_bytesize()
+
+class AssetManager:
+    # Images chargées une seule fois, converties au format de l'écran ; les chemins
+    # restent ceux utilisés dans le code ("assets/coeur.png")
+    def __init__(self, directory=ASSETS_DIR, max_scaled_bytes=ASSET_SCALED_CACHE_BYTES):
+        self.directory = directory
+        self.max_scaled_bytes = max_scaled_bytes
+        self.images = {}
+        self.scaled = OrderedDict()
+        self.scaled_bytes = 0
+
+    def preload(self):
+        # Nécessite une fenêtre ouverte : convert() dépend du format de l'écran
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError as e:
+            print(f"Dossier d'images introuvable: {e}")
+            return
+        for name in names:
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                path = os.path.join(self.directory, name)
+                try:
+                    self.get(path)
+                except pygame.error as e:
+                    print(f"Erreur lors du chargement de l'image {path}: {e}")
+
+    def get(self, path, alpha=True):
+        key = (os.path.normpath(path), alpha)
+        image = self.images.get(key)
+        if image is None:
+            image = pygame.image.load(path)
+            image = image.convert_alpha() if alpha else image.convert()
+            self.images[key] = image
+        return image
+
+    def get_scaled(self, path, size, alpha=True):
+        size = (int(size[0]), int(size[1]))
+        key = (os.path.normpath(path), alpha, size)
+        image = self.scaled.get(key)
+        if image is not None:
+            self.scaled.move_to_end(key)
+            return image
+
+        image = pygame.transform.scale(self.get(path, alpha), size)
+        self.scaled[key] = image
+        self.scaled_bytes += surface_bytes(image)
+
+        # Les variantes les moins récemment demandées sont libérées au-delà du budget
+        while self.scaled_bytes > self.max_scaled_bytes and len(self.scaled) > 1:
+            _, old = self.scaled.popitem(last=False)
+            self.scaled_bytes -= surface_bytes(old)
+        return image
+
+    def clear(self):
+        self.images.clear()
+        self.scaled.clear()
+        self.scaled_bytes = 0
+
+assets = AssetManager()
@@ -1,71 +1,51 @@
 import pygame
 import math
+from types import MappingProxyType
+from typing import NamedTuple
 from constants import *
+from fonts import fonts
+
+class ClassStats(NamedTuple):
+    # Statistiques immuables d'une classe ; les valeurs dérivées sont calculées une fois par create
+    name: str
+    health: int
+    damage: int
+    bullet_speed: float
+    speed: float
+    color: tuple
+    description: str
+    size: int
+    half_size: float
+    cannon_length: float
+    shot_cooldown: int
+    max_bullets: int
+
+    @classmethod
+    def create(cls, name, health, damage, bullet_speed, speed, color, description, size,
+               shot_cooldown=BULLET_COOLDOWN, max_bullets=DEFAULT_MAX_BULLETS):
+        # Une classe à tir rapide baisse shot_cooldown et relève max_bullets
+        return cls(name, health, damage, bullet_speed, speed, color, description, size,
+                   size / 2, size * 0.8, shot_cooldown, max_bullets)
 
 class CharacterClass:
+    registry = {}
+
     @staticmethod
     def get_classes():
-        return {
-            'ASSAULT': {
-                'name': 'Assault',
-                'health': 100,
-                'damage': 10,
-                'bullet_speed': 7,
-                'move_speed': 5,
-                'speed': 5,
-                'color': (255, 255, 255),
-                'description': 'Stats équilibrées',
-                'size': 32
-            },
-            'TANK': {
-                'name': 'Tank',
-                'health': 150,
-                'damage': 8,
-                'bullet_speed': 5,
-                'move_speed': 4,
-                'speed': 4,
-                'color': (100, 100, 255),
-                'description': 'Plus de vie, moins de dégâts',
-                'size': 40
-            },
-            'SCOUT': {
-                'name': 'Scout',
-                'health': 70,
-                'damage': 7,
-                'bullet_speed': 9,
-                'move_speed': 7,
-                'speed': 7,
-                'color': (50, 255, 50),
-                'description': 'Rapide mais fragile',
-                'size': 25
-            },
-            'SNIPER': {
-                'name': 'Sniper',
-                'health': 80,
-                'damage': 15,
-                'bullet_speed': 12,
-                'move_speed': 4,
-                'speed': 4,
-                'color': (255, 50, 50),
-                'description': 'Dégâts élevés, lent',
-                'size': 30
-            },
-            'BALANCED': {
-                'name': 'Équilibré',
-                'health': 100,
-                'damage': 10,
-                'bullet_speed': 7,
-                'move_speed': 5,
-                'speed': 5,
-                'color': (255, 255, 50),
-                'description': 'Stats équilibrées',
-                'size': 32
-            }
-        }
+        # Vue en lecture seule : les ajouts passent par register et sa vérification des doublons
+        return MappingProxyType(CharacterClass.registry)
+
+    @staticmethod
+    def register(class_type, stats):
+        # Les classes personnalisées rejoignent la même table que les classes de base
+        if class_type in CharacterClass.registry:
+            raise ValueError(f"Classe déjà enregistrée: {class_type}")
+        CharacterClass.registry[class_type] = stats
+        return stats
 
     def __init__(self, class_type):
         self.class_type = class_type
-        self.stats = self.get_classes()[class_type]
+        self.stats = CharacterClass.registry[class_type]
 
     def draw_preview(self, screen, x, y):
         preview_size = 100
@@ -73,9 +53,9 @@ class CharacterClass:
                                  preview_size, preview_size)
         
         stats_to_show = [
-            ('VIE', self.stats['health'] / 150),
-            ('VITESSE', self.stats['speed'] / 7),
-            ('DEGATS', self.stats['damage'] / 15)
+            ('VIE', self.stats.health / 150),
+            ('VITESSE', self.stats.speed / 7),
+            ('DEGATS', self.stats.damage / 15)
         ]
         
         bar_width = 70
@@ -84,17 +64,15 @@ class CharacterClass:
         spacing = 35
         text_bar_spacing = 18
         
-        font = pygame.font.Font(None, 32)
-        name_text = font.render(self.stats['name'], True, self.stats['color'])
+        name_text = fonts.render(self.stats.name, 32, self.stats.color)
         name_rect = name_text.get_rect(centerx=x, bottom=y + y_offset - 15)
         screen.blit(name_text, name_rect)
         
-        stat_font = pygame.font.Font(None, 20)
         for stat_name, stat_value in stats_to_show:
             bar_x = x - bar_width/2
             bar_y = y + y_offset + text_bar_spacing
             
-            text = stat_font.render(stat_name, True, WHITE)
+            text = fonts.render(stat_name, 20, WHITE)
             text_rect = text.get_rect(left=bar_x, top=bar_y - text_bar_spacing)
             screen.blit(text, text_rect)
             
@@ -104,4 +82,21 @@ class CharacterClass:
             pygame.draw.rect(screen, GOLD,
                            (bar_x, bar_y, bar_width * stat_value, bar_height), border_radius=2)
             
-            y_offset += spacing 
\ No newline at end of file
+            y_offset += spacing
+
+# Classes de base
+CharacterClass.register('ASSAULT', ClassStats.create(
+    name='Assault', health=100, damage=10, bullet_speed=7, speed=5,
+    color=(255, 255, 255), description='Stats équilibrées', size=32))
+CharacterClass.register('TANK', ClassStats.create(
+    name='Tank', health=150, damage=8, bullet_speed=5, speed=4,
+    color=(100, 100, 255), description='Plus de vie, moins de dégâts', size=40))
+CharacterClass.register('SCOUT', ClassStats.create(
+    name='Scout', health=70, damage=7, bullet_speed=9, speed=7,
+    color=(50, 255, 50), description='Rapide mais fragile', size=25))
+CharacterClass.register('SNIPER', ClassStats.create(
+    name='Sniper', health=80, damage=15, bullet_speed=12, speed=4,
+    color=(255, 50, 50), description='Dégâts élevés, lent', size=30))
+CharacterClass.register('BALANCED', ClassStats.create(
+    name='Équilibré', health=100, damage=10, bullet_speed=7, speed=5,
+    color=(255, 255, 50), description='Stats équilibrées', size=32))
@@ -0,0 +1,144 @@
+import math
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def slab_interval(start, delta, low, high):
+    # Intervalle du paramètre t pendant lequel start + t * delta reste dans ]low, high[
+    if delta == 0:
+        if low < start < high:
+            return -math.inf, math.inf
+        return math.inf, -math.inf
+    t1 = (low - start) / delta
+    t2 = (high - start) / delta
+    return (t1, t2) if t1 < t2 else (t2, t1)
+
+def slab_intervals(start, delta, low, high):
+    # Variante vectorisée de slab_interval
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t1 = (low - start) / delta
+        t2 = (high - start) / delta
+    enter = np.minimum(t1, t2)
+    leave = np.maximum(t1, t2)
+    still = delta == 0
+    if still.any():
+        inside = (start > low) & (start < high)
+        enter = np.where(still, np.where(inside, -np.inf, np.inf), enter)
+        leave = np.where(still, np.where(inside, np.inf, -np.inf), leave)
+    return enter, leave
+
+def sweep_box(x0, y0, x1, y1, half_w, half_h, bounds):
+    # Instant d'impact (0 à 1) d'une boîte qui glisse de (x0, y0) à (x1, y1) contre une zone alignée, ou None
+    left, top, right, bottom = bounds
+    enter_x, leave_x = slab_interval(x0, x1 - x0, left - half_w, right + half_w)
+    enter_y, leave_y = slab_interval(y0, y1 - y0, top - half_h, bottom + half_h)
+    enter = max(enter_x, enter_y, 0.0)
+    leave = min(leave_x, leave_y, 1.0)
+    return enter if enter < leave else None
+
+def sweep_boxes(x0, y0, x1, y1, left, top, right, bottom):
+    # Variante vectorisée pour des points (zones déjà élargies) ; np.inf quand il n'y a pas d'impact
+    enter_x, leave_x = slab_intervals(x0, x1 - x0, left, right)
+    enter_y, leave_y = slab_intervals(y0, y1 - y0, top, bottom)
+    enter = np.maximum(np.maximum(enter_x, enter_y), 0.0)
+    leave = np.minimum(np.minimum(leave_x, leave_y), 1.0)
+    return np.where(enter < leave, enter, np.inf)
+
+class ConvexPolygon:
+    # Polygone convexe précalculé : sommets, boîte englobante et axes séparateurs projetés
+    def __init__(self, points):
+        self.points = points
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        self.bounds = (min(xs), min(ys), max(xs), max(ys))
+
+        # Normales des arêtes (une seule par direction) avec l'intervalle de projection du polygone
+        self.axes = []
+        for i, (x1, y1) in enumerate(points):
+            x2, y2 = points[(i + 1) % len(points)]
+            nx, ny = y2 - y1, x1 - x2
+            length = math.hypot(nx, ny)
+            if length == 0:
+                continue
+            nx, ny = nx / length, ny / length
+            if any(abs(nx * ax + ny * ay) > 1 - 1e-9 for ax, ay, _, _ in self.axes):
+                continue
+            projections = [x * nx + y * ny for x, y in points]
+            self.axes.append((nx, ny, min(projections), max(projections)))
+
+    @classmethod
+    def from_rect(cls, rect, rotation=0):
+        # Même convention que pygame.transform.rotate : angle en degrés, sens antihoraire à l'écran
+        cx, cy = rect.x + rect.width / 2, rect.y + rect.height / 2
+        hw, hh = rect.width / 2, rect.height / 2
+        angle = math.radians(rotation)
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+        points = []
+        for px, py in ((-hw, -hh), (hw, -hh), (hw, hh), (-hw, hh)):
+            points.append((cx + px * cos_a + py * sin_a, cy - px * sin_a + py * cos_a))
+        return cls(points)
+
+    def intersects_box(self, left, top, right, bottom):
+        # Test exact par axes séparateurs contre une boîte alignée sur les axes
+        min_x, min_y, max_x, max_y = self.bounds
+        if left >= max_x or right <= min_x or top >= max_y or bottom <= min_y:
+            return False
+
+        cx, cy = (left + right) / 2, (top + bottom) / 2
+        hw, hh = (right - left) / 2, (bottom - top) / 2
+        for nx, ny, low, high in self.axes:
+            center = cx * nx + cy * ny
+            radius = hw * abs(nx) + hh * abs(ny)
+            if center + radius <= low or center - radius >= high:
+                return False
+        return True
+
+    def intersects_rect(self, rect):
+        return self.intersects_box(rect.left, rect.top, rect.right, rect.bottom)
+
+    def intersects_boxes(self, xs, ys, half_w, half_h):
+        # Variante vectorisée : des boîtes de même taille centrées en (xs, ys) contre ce polygone
+        min_x, min_y, max_x, max_y = self.bounds
+        hits = (xs - half_w < max_x) & (xs + half_w > min_x) & (ys - half_h < max_y) & (ys + half_h > min_y)
+        for nx, ny, low, high in self.axes:
+            center = xs * nx + ys * ny
+            radius = half_w * abs(nx) + half_h * abs(ny)
+            hits &= (center + radius > low) & (center - radius < high)
+        return hits
+
+    def sweep_box(self, x0, y0, x1, y1, half_w, half_h):
+        # Balayage exact : la somme de Minkowski d'un rectangle et d'une boîte est symétrique,
+        # elle est donc exactement l'intersection des bandes de ses axes élargies
+        min_x, min_y, max_x, max_y = self.bounds
+        dx, dy = x1 - x0, y1 - y0
+        enter_x, leave_x = slab_interval(x0, dx, min_x - half_w, max_x + half_w)
+        enter_y, leave_y = slab_interval(y0, dy, min_y - half_h, max_y + half_h)
+        enter = max(enter_x, enter_y, 0.0)
+        leave = min(leave_x, leave_y, 1.0)
+        if enter >= leave:
+            return None
+        for nx, ny, low, high in self.axes:
+            radius = half_w * abs(nx) + half_h * abs(ny)
+            axis_enter, axis_leave = slab_interval(x0 * nx + y0 * ny, dx * nx + dy * ny,
+                                                   low - radius, high + radius)
+            enter = max(enter, axis_enter)
+            leave = min(leave, axis_leave)
+            if enter >= leave:
+                return None
+        return enter
+
+    def sweep_boxes(self, x0, y0, x1, y1, half_w, half_h):
+        min_x, min_y, max_x, max_y = self.bounds
+        dx, dy = x1 - x0, y1 - y0
+        enter_x, leave_x = slab_intervals(x0, dx, min_x - half_w, max_x + half_w)
+        enter_y, leave_y = slab_intervals(y0, dy, min_y - half_h, max_y + half_h)
+        enter = np.maximum(np.maximum(enter_x, enter_y), 0.0)
+        leave = np.minimum(np.minimum(leave_x, leave_y), 1.0)
+        for nx, ny, low, high in self.axes:
+            radius = half_w * abs(nx) + half_h * abs(ny)
+            axis_enter, axis_leave = slab_intervals(x0 * nx + y0 * ny, dx * nx + dy * ny,
+                                                    low - radius, high + radius)
+            enter = np.maximum(enter, axis_enter)
+            leave = np.minimum(leave, axis_leave)
+        return np.where(enter < leave, enter, np.inf)
@@ -14,6 +14,11 @@ WINDOW_HEIGHT = 720
 FPS = 60
 GAME_TITLE = "SPACE DUEL"
 
+# Configuration de la simulation (pas fixe, indépendant du rendu)
+SIMULATION_HZ = 60  # Pas de simulation par seconde
+MAX_CATCH_UP_STEPS = 5  # Pas de rattrapage maximum par image affichée
+BASE_TICK_RATE = 60  # Les vitesses sont exprimées en pixels par 1/60 s
+
 # Couleurs
 BLACK = (0, 0, 0)  # Fond spatial
 WHITE = (255, 255, 255)
@@ -39,12 +44,17 @@ PLAYER_START_POSITIONS = [
     (WINDOW_WIDTH * 0.2, WINDOW_HEIGHT * 0.5),  # Joueur 1
     (WINDOW_WIDTH * 0.8, WINDOW_HEIGHT * 0.5)   # Joueur 2
 ]
+SHIP_ANGLE_STEPS = 128  # Orientations précalculables du sprite de vaisseau
+SHIP_SPRITE_CACHE_BYTES = 8 * 1024 * 1024  # Budget mémoire des sprites pivotés
 
 # Configuration des projectiles
 BULLET_SIZE = int(PLAYER_SIZE * 0.25)  # 25% de la taille du joueur
 BULLET_SPEED = WINDOW_WIDTH * 0.007  # 0.7% de la largeur de l'écran
 BULLET_DAMAGE = 10
 BULLET_COOLDOWN = 250  # Millisecondes entre chaque tir
+PROJECTILE_ENGINE = "AUTO"  # "AUTO" (choisi selon la capacité), "PYTHON" (balles recyclées) ou "NUMPY" (vectorisé)
+PROJECTILE_NUMPY_MIN_CAPACITY = 128  # Capacité à partir de laquelle "AUTO" choisit NumPy
+DEFAULT_MAX_BULLETS = 32  # Projectiles vivants par joueur, sauf si la classe ou le mode de jeu en décide autrement
 
 # Configuration du bouclier
 SHIELD_DURATION = 2000  # Millisecondes
@@ -63,9 +73,50 @@ GPIO_BUTTONS = {
     'PLAYER2_SHIELD': 23
 }
 
+# Configuration des obstacles
+OBSTACLE_GRID_CELL_SIZE = 64  # Taille des cellules de l'index spatial, en pixels
+OBSTACLE_GRID_MIN_OBSTACLES = 16  # En dessous, les requêtes parcourent simplement la liste
+BULLET_SWEEP_MIN_BULLETS = 16  # En dessous, les trajets des projectiles sont testés un par un
+
+# Configuration des cartes
+MAPS_DIR = "maps"  # Un fichier JSON par carte
+MAP_CACHE_DIR = "maps/.cache"  # Cartes compilées, régénérées quand les sources changent
+
 # Configuration du jeu
 GAME_DURATION = 180000  # 3 minutes en millisecondes
 VICTORY_SCORE = 3
+TELEMETRY_CAPACITY = 4096  # Événements préalloués par match (tirs, touches, boucliers)
+
+# Configuration de la base de données
+DB_WRITE_QUEUE_SIZE = 256  # Écritures en attente au maximum avant de bloquer l'appelant
+DB_WRITE_BATCH_SIZE = 64  # Écritures regroupées dans une même transaction
+DB_SYNCHRONOUS = "NORMAL"  # Avec le WAL : pas de corruption possible, seule la dernière transaction peut être perdue
+
+# Configuration des replays
+REPLAYS_DIR = "replays"
+REPLAY_EXTENSION = ".rep"
+SNAPSHOT_INTERVAL = 60  # Pas de simulation entre deux sauvegardes d'état
+SNAPSHOT_BUFFER_BYTES = 128 * 1024  # Mémoire des sauvegardes gardées, les plus anciennes sont oubliées
+INSTANT_REPLAY_SECONDS = 10
+
+# Configuration du jeu en réseau
+NET_PORT = 7777
+NET_INPUT_DELAY = 2  # Pas de retard appliqués aux entrées locales
+NET_MAX_ROLLBACK = 8  # Pas prédits au plus avant d'attendre l'adversaire
+NET_MAX_INPUTS_PER_PACKET = 32
+NET_CHECKSUM_INTERVAL = 30  # Pas entre deux comparaisons d'empreintes
+NET_HANDSHAKE_TIMEOUT = 30  # Secondes d'attente de l'autre borne
+
+# Configuration des spectateurs
+SPECTATOR_ENABLED = True
+SPECTATOR_HOST = "127.0.0.1"  # "0.0.0.0" pour des écrans sur le réseau local
+SPECTATOR_PORT = 7788
+SPECTATOR_KEYFRAME_INTERVAL = 30  # Pas entre deux images complètes
+SPECTATOR_TIMEOUT = 5  # Secondes sans nouvelles avant d'oublier un spectateur
+
+# Configuration des images
+ASSETS_DIR = "assets"
+ASSET_SCALED_CACHE_BYTES = 32 * 1024 * 1024  # Budget mémoire des images redimensionnées
 
 # Configuration de l'interface
 BUTTON_WIDTH = 200
@@ -73,6 +124,18 @@ BUTTON_HEIGHT = 50
 FONT_SIZE_LARGE = 72
 FONT_SIZE_MEDIUM = 36
 FONT_SIZE_SMALL = 24
+HEART_SIZE = 20
+TEXT_CACHE_SIZE = 512  # Textes rendus gardés en mémoire
+MAX_DIRTY_RECTS = 96  # Au-delà, l'écran est mis à jour en entier
+PROFILER_FRAMES = 240  # Images gardées par le profileur (4 secondes à 60 images/s)
+PROFILER_REFRESH = 10  # Images entre deux mises à jour du panneau du profileur
+PROFILER_KEY = pygame.K_F3  # Affiche ou masque le profileur
+PROFILER_RESET_KEY = pygame.K_F4  # Remet ses mesures à zéro
+PROFILER_TRACE_KEY = pygame.K_F5  # Enregistre une trace des étapes de chaque image
+PROFILER_CPROFILE_KEY = pygame.K_F6  # Lance cProfile sur les images suivantes
+PROFILER_TRACE_FRAMES = 600  # Images par trace (10 secondes à 60 images/s)
+PROFILER_CPROFILE_FRAMES = 300  # Images profilées par cProfile
+PROFILES_DIR = "profiles"  # Dossier des traces et profils enregistrés
 
 # Dimensions de la fenêtre
 WINDOW_WIDTH = 1280
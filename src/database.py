@@ -1,31 +1,140 @@
 import sqlite3
 import json
+import queue
+import threading
 from pathlib import Path
+from concurrent.futures import Future
+from constants import *
+
+SCHEMA_VERSION = 2  # Stockée dans PRAGMA user_version
 
 class Database:
-    def __init__(self):
-        self.db_path = Path("game_data.db")
+    def __init__(self, db_path="game_data.db"):
+        self.db_path = Path(db_path)
         self.connection = None
+        # Résultats des lectures fréquentes, vidés à chaque écriture
+        self.query_cache = {}
+        self.cache_generation = 0
+        self.cache_lock = threading.Lock()
+        # Les écritures passent par un thread dédié qui possède sa propre connexion
+        self.write_queue = queue.Queue(maxsize=DB_WRITE_QUEUE_SIZE)
+        self.writer = None
         if not self.db_path.exists():
             self.init_database()
+        else:
+            self.migrate()
+        
+    def open_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        # Le WAL laisse les lectures se faire pendant que le thread d'écriture valide
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS}")
+        return conn
         
     def get_connection(self):
         if self.connection is None:
-            self.connection = sqlite3.connect(self.db_path)
-            self.connection.execute("PRAGMA foreign_keys = ON")
+            self.connection = self.open_connection()
         return self.connection
         
     def close(self):
+        # Toutes les écritures en attente sont enregistrées avant la fermeture
+        if self.writer:
+            self.write_queue.put(None)
+            self.writer.join()
+            self.writer = None
         if self.connection:
             self.connection.close()
             self.connection = None
+            
+    def submit(self, operation):
+        # operation(cursor) est exécutée par le thread d'écriture ; le Future porte son résultat
+        if self.writer is None:
+            self.writer = threading.Thread(target=self.write_loop, name="db-writer", daemon=True)
+            self.writer.start()
+        future = Future()
+        self.write_queue.put((operation, future))
+        return future
+        
+    def flush(self):
+        self.write_queue.join()
+        
+    def write_loop(self):
+        conn = self.open_connection()
+        try:
+            running = True
+            while running:
+                batch = [self.write_queue.get()]
+                while len(batch) < DB_WRITE_BATCH_SIZE:
+                    try:
+                        batch.append(self.write_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                running = None not in batch
+                self.run_batch(conn, [item for item in batch if item is not None])
+                for _ in batch:
+                    self.write_queue.task_done()
+        finally:
+            conn.close()
+            
+    def run_batch(self, conn, batch):
+        if not batch:
+            return
+        try:
+            # Une seule transaction (et une seule synchronisation disque) pour tout le lot
+            with conn:
+                cursor = conn.cursor()
+                results = [operation(cursor) for operation, _ in batch]
+        except Exception:
+            # Le lot est annulé : chaque écriture est rejouée seule pour isoler la fautive
+            results = None
+            
+        if results is None:
+            results = []
+            for operation, _ in batch:
+                try:
+                    with conn:
+                        results.append((operation(conn.cursor()), None))
+                except Exception as e:
+                    print(f"Erreur lors de l'écriture en base: {e}")
+                    results.append((None, e))
+        else:
+            results = [(result, None) for result in results]
+            
+        # Le cache est vidé avant de réveiller les appelants, qui doivent relire les nouvelles données
+        self.invalidate_cache()
+        for (_, future), (result, error) in zip(batch, results):
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+            
+    def cached(self, key, query):
+        with self.cache_lock:
+            if key in self.query_cache:
+                return self.query_cache[key]
+            generation = self.cache_generation
+        result = query()
+        with self.cache_lock:
+            # Un résultat lu pendant une écriture n'est pas gardé
+            if generation == self.cache_generation:
+                self.query_cache[key] = result
+        return result
+        
+    def invalidate_cache(self):
+        with self.cache_lock:
+            self.cache_generation += 1
+            self.query_cache = {}
         
     def reset_database(self):
         self.close()
+        self.invalidate_cache()
         
         if self.db_path.exists():
             try:
                 self.db_path.unlink()
+                for suffix in ("-wal", "-shm"):
+                    Path(str(self.db_path) + suffix).unlink(missing_ok=True)
             except PermissionError:
                 conn = self.get_connection()
                 cursor = conn.cursor()
@@ -78,21 +187,64 @@ class Database:
             ''')
             
             conn.commit()
+        self.migrate()
+        
+    def migrate(self):
+        # Mise à niveau du schéma d'une base existante, une étape par version
+        conn = self.get_connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        
+        with conn:
+            cursor = conn.cursor()
+            if version < 1:
+                # Taux de victoire stocké et indexé : le classement devient un parcours d'index
+                cursor.execute("ALTER TABLE players ADD COLUMN win_rate REAL DEFAULT 0")
+                cursor.execute('''
+                    UPDATE players
+                    SET win_rate = CASE
+                        WHEN total_games > 0 THEN ROUND(CAST(total_wins AS FLOAT) / total_games * 100, 1)
+                        ELSE 0
+                    END
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_players_leaderboard
+                    ON players (win_rate DESC, total_wins DESC) WHERE total_games > 0
+                ''')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_matches_player1 ON matches (player1_id)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_matches_player2 ON matches (player2_id)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_matches_winner ON matches (winner_id)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_matches_played_at ON matches (played_at)")
+            if version < 2:
+                # Télémétrie compressée d'un match (voir telemetry.py), à part pour garder la table des matchs légère
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS match_telemetry (
+                        match_id INTEGER PRIMARY KEY REFERENCES matches (id) ON DELETE CASCADE,
+                        data BLOB NOT NULL
+                    )
+                ''')
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
             
     def add_player(self, name):
+        # L'identifiant est nécessaire tout de suite : on attend que l'écriture soit faite
+        return self.submit(lambda cursor: self.write_player(cursor, name)).result()
+        
+    def write_player(self, cursor, name):
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    'INSERT INTO players (name) VALUES (?)',
-                    (name,)
-                )
-                return cursor.lastrowid
+            cursor.execute(
+                'INSERT INTO players (name) VALUES (?)',
+                (name,)
+            )
+            return cursor.lastrowid
         except sqlite3.IntegrityError:
             cursor.execute('SELECT id FROM players WHERE name = ?', (name,))
             return cursor.fetchone()[0]
             
     def get_player(self, player_id):
+        return self.cached(('player', player_id), lambda: self.query_player(player_id))
+        
+    def query_player(self, player_id):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -102,6 +254,9 @@ class Database:
             return cursor.fetchone()
             
     def get_player_by_name(self, name):
+        return self.cached(('player_name', name), lambda: self.query_player_by_name(name))
+        
+    def query_player_by_name(self, name):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -111,57 +266,125 @@ class Database:
             return cursor.fetchone()
             
     def save_match(self, match_data):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
+        self.submit(lambda cursor: self.write_match(cursor, match_data))
             
+    def write_match(self, cursor, match_data):
+        cursor.execute('''
+            INSERT INTO matches (
+                player1_id, player2_id, player1_score, player2_score,
+                winner_id, player1_class, player2_class, duration
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            match_data['player1_id'], match_data['player2_id'],
+            match_data['player1_score'], match_data['player2_score'],
+            match_data['winner_id'], match_data['player1_class'],
+            match_data['player2_class'], match_data['duration']
+        ))
+        
+        if match_data.get('telemetry'):
+            cursor.execute('INSERT INTO match_telemetry (match_id, data) VALUES (?, ?)',
+                           (cursor.lastrowid, match_data['telemetry']))
+        
+        for player_id in [match_data['player1_id'], match_data['player2_id']]:
             cursor.execute('''
-                INSERT INTO matches (
-                    player1_id, player2_id, player1_score, player2_score,
-                    winner_id, player1_class, player2_class, duration
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                UPDATE players 
+                SET total_games = total_games + 1,
+                    total_wins = total_wins + CASE 
+                        WHEN id = ? THEN 1 
+                        ELSE 0 
+                    END,
+                    best_score = CASE
+                        WHEN id = ? AND ? > best_score THEN ?
+                        ELSE best_score
+                    END,
+                    win_rate = ROUND(CAST(total_wins + CASE WHEN id = ? THEN 1 ELSE 0 END AS FLOAT)
+                                     / (total_games + 1) * 100, 1)
+                WHERE id = ?
             ''', (
+                match_data['winner_id'],
+                player_id,
+                match_data['player1_score'] if player_id == match_data['player1_id'] else match_data['player2_score'],
+                match_data['player1_score'] if player_id == match_data['player1_id'] else match_data['player2_score'],
+                match_data['winner_id'],
+                player_id
+            ))
+        
+    def save_matches(self, matches):
+        # Import en masse ; la liste est copiée car l'écriture se fait plus tard, dans un autre thread
+        matches = list(matches)
+        return self.submit(lambda cursor: self.write_matches(cursor, matches))
+        
+    def write_matches(self, cursor, matches):
+        # executemany pour les matchs, puis une seule mise à jour par joueur concerné
+        aggregates = {}
+        insert = '''
+            INSERT INTO matches (
+                player1_id, player2_id, player1_score, player2_score,
+                winner_id, player1_class, player2_class, duration
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        pending = []
+        for match_data in matches:
+            for player_id, score in ((match_data['player1_id'], match_data['player1_score']),
+                                     (match_data['player2_id'], match_data['player2_score'])):
+                games, wins, best_score = aggregates.get(player_id, (0, 0, 0))
+                aggregates[player_id] = (games + 1,
+                                         wins + (player_id == match_data['winner_id']),
+                                         max(best_score, score))
+            row = (
                 match_data['player1_id'], match_data['player2_id'],
                 match_data['player1_score'], match_data['player2_score'],
                 match_data['winner_id'], match_data['player1_class'],
                 match_data['player2_class'], match_data['duration']
-            ))
+            )
+            if not match_data.get('telemetry'):
+                pending.append(row)
+                continue
+            # Un match avec télémétrie est inséré seul : lastrowid donne l'identifiant à lui rattacher,
+            # dans l'ordre de la liste
+            if pending:
+                cursor.executemany(insert, pending)
+                pending = []
+            cursor.execute(insert, row)
+            cursor.execute('INSERT INTO match_telemetry (match_id, data) VALUES (?, ?)',
+                           (cursor.lastrowid, match_data['telemetry']))
+        if pending:
+            cursor.executemany(insert, pending)
+        
+        cursor.executemany('''
+            UPDATE players
+            SET total_games = total_games + ?,
+                total_wins = total_wins + ?,
+                best_score = MAX(best_score, ?),
+                win_rate = ROUND(CAST(total_wins + ? AS FLOAT) / (total_games + ?) * 100, 1)
+            WHERE id = ?
+        ''', [(games, wins, best_score, wins, games, player_id)
+              for player_id, (games, wins, best_score) in aggregates.items()])
+        
+        return len(matches)
             
-            for player_id in [match_data['player1_id'], match_data['player2_id']]:
-                cursor.execute('''
-                    UPDATE players 
-                    SET total_games = total_games + 1,
-                        total_wins = total_wins + CASE 
-                            WHEN id = ? THEN 1 
-                            ELSE 0 
-                        END,
-                        best_score = CASE
-                            WHEN id = ? AND ? > best_score THEN ?
-                            ELSE best_score
-                        END
-                    WHERE id = ?
-                ''', (
-                    match_data['winner_id'],
-                    player_id,
-                    match_data['player1_score'] if player_id == match_data['player1_id'] else match_data['player2_score'],
-                    match_data['player1_score'] if player_id == match_data['player1_id'] else match_data['player2_score'],
-                    player_id
-                ))
+    def get_telemetry(self, match_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT data FROM match_telemetry WHERE match_id = ?', (match_id,))
+            result = cursor.fetchone()
+            return result[0] if result else None
             
-            conn.commit()
+    def iter_telemetry(self):
+        # Parcourt les blocs match par match sans tout charger en mémoire
+        cursor = self.get_connection().cursor()
+        cursor.execute('SELECT match_id, data FROM match_telemetry ORDER BY match_id')
+        for match_id, data in cursor:
+            yield match_id, data
             
     def get_leaderboard(self, limit=10):
+        return self.cached(('leaderboard', limit), lambda: self.query_leaderboard(limit))
+        
+    def query_leaderboard(self, limit):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT 
-                    name,
-                    total_games,
-                    total_wins,
-                    best_score,
-                    CASE 
-                        WHEN total_games > 0 THEN ROUND(CAST(total_wins AS FLOAT) / total_games * 100, 1)
-                        ELSE 0 
-                    END as win_rate
+                SELECT name, total_games, total_wins, best_score, win_rate
                 FROM players
                 WHERE total_games > 0
                 ORDER BY win_rate DESC, total_wins DESC
@@ -170,14 +393,14 @@ class Database:
             return cursor.fetchall()
             
     def save_settings(self, settings):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            settings_json = json.dumps(settings)
-            cursor.execute('''
-                INSERT OR REPLACE INTO settings (id, settings_data)
-                VALUES (1, ?)
-            ''', (settings_json,))
-            conn.commit()
+        settings_json = json.dumps(settings)
+        self.submit(lambda cursor: self.write_settings(cursor, settings_json))
+        
+    def write_settings(self, cursor, settings_json):
+        cursor.execute('''
+            INSERT OR REPLACE INTO settings (id, settings_data)
+            VALUES (1, ?)
+        ''', (settings_json,))
             
     def load_settings(self):
         with self.get_connection() as conn:
@@ -189,19 +412,23 @@ class Database:
             return None 
 
     def get_all_players(self):
+        return self.cached(('players',), self.query_all_players)
+        
+    def query_all_players(self):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT id, name FROM players ORDER BY name')
             return cursor.fetchall() 
 
     def reset_scores(self):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE players 
-                SET total_games = 0,
-                    total_wins = 0,
-                    best_score = 0
-            ''')
-            cursor.execute('DELETE FROM matches')
-            conn.commit() 
\ No newline at end of file
+        self.submit(self.write_reset_scores)
+        
+    def write_reset_scores(self, cursor):
+        cursor.execute('''
+            UPDATE players 
+            SET total_games = 0,
+                total_wins = 0,
+                best_score = 0,
+                win_rate = 0
+        ''')
+        cursor.execute('DELETE FROM matches')
\ No newline at end of file
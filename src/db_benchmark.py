@@ -0,0 +1,158 @@
+import os
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from database import Database
+
+# Requête de classement d'origine : le taux de victoire est recalculé et trié à chaque appel
+LEGACY_LEADERBOARD = '''
+    SELECT name, total_games, total_wins, best_score,
+        CASE
+            WHEN total_games > 0 THEN ROUND(CAST(total_wins AS FLOAT) / total_games * 100, 1)
+            ELSE 0
+        END as win_rate
+    FROM players
+    WHERE total_games > 0
+    ORDER BY win_rate DESC, total_wins DESC
+    LIMIT ?
+'''
+
+CLASSES = ['Assault', 'Tank', 'Scout', 'Sniper', 'Équilibré']
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Mesure des requêtes de la base sur un gros historique")
+    parser.add_argument("--matches", type=int, default=1000000, help="Nombre de matchs générés")
+    parser.add_argument("--players", type=int, default=10000, help="Nombre de joueurs générés")
+    parser.add_argument("--seed", type=int, default=1, help="Graine aléatoire")
+    parser.add_argument("--repeat", type=int, default=20, help="Répétitions de chaque requête")
+    parser.add_argument("--inserts", type=int, default=2000, help="Matchs enregistrés un par un pour la mesure d'écriture")
+    parser.add_argument("--bulk", type=int, default=100000, help="Matchs importés d'un bloc avec save_matches")
+    parser.add_argument("--db", default=None, help="Base à créer (fichier temporaire sinon)")
+    return parser.parse_args()
+
+def generate_matches(count, players, rng):
+    start = datetime(2024, 1, 1)
+    for _ in range(count):
+        player1, player2 = rng.sample(range(1, players + 1), 2)
+        score1, score2 = rng.randrange(10001), rng.randrange(10001)
+        winner = player1 if score1 >= score2 else player2
+        played_at = start + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        yield (player1, player2, score1, score2, winner, rng.choice(CLASSES), rng.choice(CLASSES),
+               rng.randrange(20000, 180000), played_at.strftime("%Y-%m-%d %H:%M:%S"))
+
+def match_data(row):
+    return {
+        'player1_id': row[0], 'player2_id': row[1],
+        'player1_score': row[2], 'player2_score': row[3],
+        'winner_id': row[4], 'player1_class': row[5],
+        'player2_class': row[6], 'duration': row[7]
+    }
+
+def populate(db, players, matches, rng):
+    games = [0] * (players + 1)
+    wins = [0] * (players + 1)
+    best = [0] * (players + 1)
+
+    def rows():
+        for row in generate_matches(matches, players, rng):
+            player1, player2, score1, score2, winner = row[:5]
+            games[player1] += 1
+            games[player2] += 1
+            wins[winner] += 1
+            best[player1] = max(best[player1], score1)
+            best[player2] = max(best[player2], score2)
+            yield row
+
+    conn = db.get_connection()
+    with conn:
+        conn.executemany('INSERT INTO players (name) VALUES (?)',
+                         ((f"Joueur {i}",) for i in range(1, players + 1)))
+        conn.executemany('''
+            INSERT INTO matches (
+                player1_id, player2_id, player1_score, player2_score, winner_id,
+                player1_class, player2_class, duration, played_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows())
+        conn.executemany('''
+            UPDATE players
+            SET total_games = ?, total_wins = ?, best_score = ?,
+                win_rate = CASE WHEN ? > 0 THEN ROUND(CAST(? AS FLOAT) / ? * 100, 1) ELSE 0 END
+            WHERE id = ?
+        ''', ((games[i], wins[i], best[i], games[i], wins[i], games[i], i) for i in range(1, players + 1)))
+
+def measure(conn, sql, params, repeat):
+    # Meilleur temps sur plusieurs exécutions, en millisecondes
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def query_plan(conn, sql, params):
+    return "; ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    path = args.db or os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    if os.path.exists(path):
+        print(f"La base {path} existe déjà")
+        return
+
+    db = Database(path)
+    start = time.perf_counter()
+    populate(db, args.players, args.matches, rng)
+    print(f"{args.matches} matchs et {args.players} joueurs générés en {time.perf_counter() - start:.1f} s ({path})")
+
+    conn = db.get_connection()
+    player_id = rng.randrange(1, args.players + 1)
+    comparisons = [
+        ("Classement (top 10)",
+         LEGACY_LEADERBOARD, '''
+            SELECT name, total_games, total_wins, best_score, win_rate
+            FROM players WHERE total_games > 0
+            ORDER BY win_rate DESC, total_wins DESC LIMIT ?
+         ''', (10,)),
+        ("Matchs d'un joueur",
+         "SELECT COUNT(*) FROM matches NOT INDEXED WHERE player1_id = ? OR player2_id = ?",
+         "SELECT COUNT(*) FROM matches WHERE player1_id = ? OR player2_id = ?",
+         (player_id, player_id)),
+        ("Victoires d'un joueur",
+         "SELECT COUNT(*) FROM matches NOT INDEXED WHERE winner_id = ?",
+         "SELECT COUNT(*) FROM matches WHERE winner_id = ?",
+         (player_id,)),
+        ("20 derniers matchs",
+         "SELECT id FROM matches NOT INDEXED ORDER BY played_at DESC LIMIT ?",
+         "SELECT id FROM matches ORDER BY played_at DESC LIMIT ?",
+         (20,))
+    ]
+
+    for label, before_sql, after_sql, params in comparisons:
+        before = measure(conn, before_sql, params, args.repeat)
+        after = measure(conn, after_sql, params, args.repeat)
+        print(f"{label:<24} avant {before:9.3f} ms   après {after:9.3f} ms   x{before / max(after, 1e-9):.0f}")
+        print(f"  plan: {query_plan(conn, after_sql, params)}")
+
+    # Écriture : match par match (regroupés par lots du thread d'écriture), puis en masse
+    single = [match_data(row) for row in generate_matches(args.inserts, args.players, rng)]
+    start = time.perf_counter()
+    for data in single:
+        db.save_match(data)
+    db.flush()
+    single_rate = args.inserts / (time.perf_counter() - start)
+    print(f"save_match:   {single_rate:9.0f} matchs/s")
+
+    bulk = [match_data(row) for row in generate_matches(args.bulk, args.players, rng)]
+    start = time.perf_counter()
+    db.save_matches(bulk).result()
+    bulk_rate = args.bulk / (time.perf_counter() - start)
+    print(f"save_matches: {bulk_rate:9.0f} matchs/s   x{bulk_rate / single_rate:.1f}")
+
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import pygame
+from collections import OrderedDict
+from constants import *
+
+class FontManager:
+    # Polices créées une seule fois par taille, textes rendus gardés tant qu'ils resservent
+    def __init__(self, max_texts=TEXT_CACHE_SIZE):
+        self.max_texts = max_texts
+        self.fonts = {}
+        self.texts = OrderedDict()
+
+    def get(self, size, name=None):
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(name, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, size, color, antialias=True, name=None):
+        # Les surfaces renvoyées sont partagées : ne pas les modifier
+        key = (name, size, text, tuple(color), antialias)
+        surface = self.texts.get(key)
+        if surface is not None:
+            self.texts.move_to_end(key)
+            return surface
+
+        surface = self.get(size, name).render(text, antialias, color)
+        self.texts[key] = surface
+        if len(self.texts) > self.max_texts:
+            self.texts.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.fonts.clear()
+        self.texts.clear()
+
+fonts = FontManager()
@@ -1,15 +1,39 @@
-import pygame
+import zlib
+import struct
+from time import perf_counter_ns
 from player import Player
 from obstacle import ObstacleManager
 from constants import *
 from character_class import CharacterClass
+from timestep import FixedTimestep
+from projectiles import create_projectile_store
+from assets import assets
+from fonts import fonts
+from telemetry import TelemetryRecorder, SHOT, HIT, SHIELD
+from replay import ReplayRecorder
+from snapshots import SnapshotBuffer
+from profiler import profiler, INPUT, PLAYERS, PROJECTILES, COLLISIONS, OBSTACLES, SPRITES, HUD
 
 class Game:
-    def __init__(self, game_settings):
+    # Tick, temps restant, fin de partie, vainqueur, date de fin, retour au menu, scores, dernier coup
+    # porté, multiplicateur de combo, dégâts infligés, événements et entrées déjà enregistrés
+    SNAPSHOT = struct.Struct("<Id?bd?2i2d2d2i2I")
+
+    def __init__(self, game_settings, tick_rate=SIMULATION_HZ, max_catch_up_steps=MAX_CATCH_UP_STEPS,
+                 headless=False):
+        self.headless = headless
+        self.game_settings = game_settings
+        self.tick_rate = tick_rate
         self.obstacle_manager = ObstacleManager(game_settings['map_type'])
+        self.step_scale = BASE_TICK_RATE / tick_rate
+        classes = [CharacterClass(game_settings['player_classes'][i]) for i in range(2)]
+        # Un mode de jeu peut imposer sa limite de projectiles à la place de celle des classes
+        caps = [game_settings.get('max_bullets') or character_class.stats.max_bullets for character_class in classes]
+        self.projectiles = create_projectile_store(
+            self.step_scale, game_settings.get('projectile_engine', PROJECTILE_ENGINE), sum(caps))
         self.players = [
-            Player(0, CharacterClass(game_settings['player_classes'][0]), self.obstacle_manager),
-            Player(1, CharacterClass(game_settings['player_classes'][1]), self.obstacle_manager)
+            Player(i, classes[i], self.obstacle_manager, self.projectiles, headless, caps[i])
+            for i in range(2)
         ]
         
         for player in self.players:
@@ -19,7 +43,10 @@ class Game:
         self.scores = [0, 0]
         self.game_over = False
         self.winner = None
-        self.start_time = pygame.time.get_ticks()
+        self.timestep = FixedTimestep(tick_rate, max_catch_up_steps)
+        self.step_ms = self.timestep.step_ms
+        self.tick = 0
+        self.sim_time = 0
         self.time_remaining = GAME_DURATION
         self.return_to_menu = False
         self.end_time = None
@@ -27,6 +54,16 @@ class Game:
         self.last_damage_time = [0, 0]
         self.combo_multiplier = [1.0, 1.0]
         self.damage_dealt = [{}, {}]
+        self.telemetry = TelemetryRecorder()
+        self.replay = None
+        self.snapshots = None
+        self.banner = None
+        self.publisher = None
+        
+        self.static_layer = None
+        self.static_revision = None
+        self.drawn_rects = []
+        self.full_redraw = True
         
     def calculate_score(self, player_index):
         player = self.players[player_index]
@@ -35,8 +72,8 @@ class Game:
         total_damage_dealt = sum(self.damage_dealt[player_index].values())
         total_damage_received = sum(self.damage_dealt[1 - player_index].values())
         
-        damage_score = 5000 * (total_damage_dealt / other_player.character_class.stats['health'])
-        survival_score = 5000 * (1 - (total_damage_received / player.character_class.stats['health']))
+        damage_score = 5000 * (total_damage_dealt / other_player.stats.health)
+        survival_score = 5000 * (1 - (total_damage_received / player.stats.health))
         
         base_score = min(10000, damage_score + survival_score)
         victory_multiplier = 1.2 if self.winner == player_index else 1.0
@@ -44,55 +81,143 @@ class Game:
         
         return final_score
         
-    def update(self, input_handler):
+    def update(self, input_handler, elapsed_ms):
+        # Avance la simulation d'autant de pas fixes que le temps réel écoulé le permet
+        for _ in range(self.timestep.advance(elapsed_ms)):
+            self.step(input_handler)
+            if self.return_to_menu:
+                break
+        
+    def step(self, input_handler):
+        self.tick += 1
+        self.sim_time = self.tick * self.step_ms
+        
         if self.game_over:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.end_time > 3000:
-                self.scores = [self.calculate_score(0), self.calculate_score(1)]
-                self.return_to_menu = True
+            for player in self.players:
+                player.settle()
+            self.projectiles.settle()
+            if self.sim_time - self.end_time > 3000:
+                self.finish()
+            if self.publisher is not None:
+                self.publisher.publish(self)
             return
             
-        current_time = pygame.time.get_ticks()
-        self.time_remaining = max(0, GAME_DURATION - (current_time - self.start_time))
+        self.time_remaining = max(0, GAME_DURATION - self.sim_time)
         
+        profiling = profiler.enabled
         for i, player in enumerate(self.players):
+            if profiling:
+                start = perf_counter_ns()
             inputs = input_handler.get_player_input(i)
+            if self.replay is not None:
+                inputs = self.replay.capture(inputs)
+            if profiling:
+                start = profiler.add(INPUT, start)
             
-            player.move(inputs['dx'], inputs['dy'])
+            player.move(inputs['dx'], inputs['dy'], self.step_scale)
             
-            if inputs['fire']:
-                player.shoot()
-            if inputs['shield']:
-                player.activate_shield()
+            if inputs['fire'] and player.shoot(self.sim_time):
+                self.telemetry.record(self.tick, SHOT, i, player.x, player.y)
+            if inputs['shield'] and player.activate_shield(self.sim_time):
+                self.telemetry.record(self.tick, SHIELD, i, player.x, player.y)
                 
-            player.update()
+            player.update(self.sim_time)
+            if profiling:
+                profiler.add(PLAYERS, start)
             
+        if profiling:
+            start = perf_counter_ns()
+        self.projectiles.update(self.obstacle_manager)
+        if profiling:
+            start = profiler.add(PROJECTILES, start)
         self.check_collisions()
+        if profiling:
+            profiler.add(COLLISIONS, start)
         self.check_game_over()
         
+        if self.snapshots is not None:
+            self.snapshots.capture(self)
+        if self.publisher is not None:
+            self.publisher.publish(self)
+        
+    def start_recording(self, seed=0):
+        # À appeler avant le premier pas : les entrées de chaque pas sont gardées pour un replay
+        self.replay = ReplayRecorder(self.game_settings, self.tick_rate, self.projectiles.ENGINE, seed)
+        self.snapshots = SnapshotBuffer()
+        self.snapshots.push(self.tick, self.save_snapshot())
+        
+    def encode_replay(self):
+        return self.replay.encode(self.tick, self.checksum())
+        
+    def checksum(self):
+        # Empreinte de l'état simulé : mêmes réglages et mêmes entrées, même empreinte
+        state = [struct.pack("<Id?b2i", self.tick, self.time_remaining, self.game_over,
+                             -2 if self.winner is None else self.winner, *self.scores)]
+        state.extend(player.pack_state() for player in self.players)
+        state.append(self.projectiles.pack())
+        return zlib.crc32(b"".join(state))
+        
+    def save_snapshot(self):
+        # État complet de la simulation, de quoi reprendre la partie à ce pas
+        damage = [sum(self.damage_dealt[i].values()) for i in range(2)]
+        header = self.SNAPSHOT.pack(
+            self.tick, self.time_remaining, self.game_over, -2 if self.winner is None else self.winner,
+            -1 if self.end_time is None else self.end_time, self.return_to_menu, *self.scores,
+            *self.last_damage_time, *self.combo_multiplier, *damage,
+            self.telemetry.count, 0 if self.replay is None else len(self.replay))
+        return b"".join([header] + [player.pack_state() for player in self.players] +
+                        [self.projectiles.pack()])
+        
+    def load_snapshot(self, data):
+        (self.tick, self.time_remaining, self.game_over, winner, end_time, self.return_to_menu,
+         score1, score2, last_damage1, last_damage2, combo1, combo2, damage1, damage2,
+         telemetry_count, replay_length) = self.SNAPSHOT.unpack_from(data)
+        self.sim_time = self.tick * self.step_ms
+        self.winner = None if winner == -2 else winner
+        self.end_time = None if end_time < 0 else end_time
+        self.scores = [score1, score2]
+        self.last_damage_time = [last_damage1, last_damage2]
+        self.combo_multiplier = [combo1, combo2]
+        # Un seul adversaire par joueur : les dégâts se résument à un total
+        self.damage_dealt = [{self.players[1 - i].character_class: damage} if damage else {}
+                             for i, damage in enumerate((damage1, damage2))]
+        
+        offset = self.SNAPSHOT.size
+        for player in self.players:
+            player.unpack_state(data[offset:offset + Player.STATE.size])
+            offset += Player.STATE.size
+        self.projectiles.unpack(data[offset:])
+        
+        self.telemetry.truncate(telemetry_count)
+        if self.replay is not None:
+            self.replay.truncate(replay_length)
+        
+    def finish(self):
+        self.scores = [self.calculate_score(0), self.calculate_score(1)]
+        self.return_to_menu = True
+        
     def check_collisions(self):
-        for i, player in enumerate(self.players):
+        hits = self.projectiles.collide_ships([player.rect for player in self.players])
+        for i, damage in hits:
             other_player = self.players[1 - i]
+            health = other_player.health
+            other_player.take_damage(damage)
+            self.telemetry.record(self.tick, HIT, i, other_player.x, other_player.y,
+                                  health - other_player.health)
             
-            for bullet in player.bullets[:]:
-                if bullet['rect'].colliderect(other_player.rect):
-                    damage = bullet['damage']
-                    other_player.take_damage(damage)
-                    
-                    if other_player.character_class not in self.damage_dealt[i]:
-                        self.damage_dealt[i][other_player.character_class] = 0
-                    self.damage_dealt[i][other_player.character_class] += damage
-                    
-                    current_time = pygame.time.get_ticks()
-                    time_since_last_hit = current_time - self.last_damage_time[i]
-                    
-                    if time_since_last_hit < 2000:
-                        self.combo_multiplier[i] = min(2.0, self.combo_multiplier[i] + 0.1)
-                    else:
-                        self.combo_multiplier[i] = 1.0
-                    
-                    self.last_damage_time[i] = current_time
-                    player.bullets.remove(bullet)
+            if other_player.character_class not in self.damage_dealt[i]:
+                self.damage_dealt[i][other_player.character_class] = 0
+            self.damage_dealt[i][other_player.character_class] += damage
+            
+            current_time = self.sim_time
+            time_since_last_hit = current_time - self.last_damage_time[i]
+            
+            if time_since_last_hit < 2000:
+                self.combo_multiplier[i] = min(2.0, self.combo_multiplier[i] + 0.1)
+            else:
+                self.combo_multiplier[i] = 1.0
+            
+            self.last_damage_time[i] = current_time
                     
     def check_game_over(self):
         if self.game_over:
@@ -106,14 +231,14 @@ class Game:
                 self.winner = 1
             else:
                 self.winner = -1
-            self.end_time = pygame.time.get_ticks()
+            self.end_time = self.sim_time
             return
             
         for i, player in enumerate(self.players):
             if player.health <= 0:
                 self.game_over = True
                 self.winner = 1 - i
-                self.end_time = pygame.time.get_ticks()
+                self.end_time = self.sim_time
                 return
                 
     def get_match_data(self):
@@ -123,32 +248,53 @@ class Game:
             'player1_score': self.scores[0],
             'player2_score': self.scores[1],
             'winner_id': self.player_data[self.winner]['id'] if self.winner >= 0 else None,
-            'player1_class': self.players[0].character_class.stats['name'],
-            'player2_class': self.players[1].character_class.stats['name'],
-            'duration': GAME_DURATION - self.time_remaining
+            'player1_class': self.players[0].stats.name,
+            'player2_class': self.players[1].stats.name,
+            'duration': int(GAME_DURATION - self.time_remaining)
         }
                 
+    def invalidate(self):
+        # Force le prochain affichage à tout redessiner (changement de mode d'écran, retour de menu)
+        self.full_redraw = True
+
     def draw(self, screen):
-        screen.fill(BLACK)
-        
-        self.obstacle_manager.draw(screen)
+        # Renvoie les zones de l'écran à mettre à jour avec pygame.display.update
+        profiling = profiler.enabled
+        if profiling:
+            start = perf_counter_ns()
+        if (self.static_layer is None or self.static_layer.get_size() != screen.get_size() or
+                self.static_revision != self.obstacle_manager.revision):
+            self.static_layer = self.obstacle_manager.render_layer(screen.get_size())
+            self.static_revision = self.obstacle_manager.revision
+            self.full_redraw = True
+
+        # Les zones dessinées à l'image précédente sont restaurées depuis la couche statique
+        if self.full_redraw:
+            screen.blit(self.static_layer, (0, 0))
+        else:
+            for rect in self.drawn_rects:
+                screen.blit(self.static_layer, rect, rect)
+        drawn = []
+        if profiling:
+            start = profiler.add(OBSTACLES, start)
         
+        alpha = self.timestep.alpha
         for player in self.players:
-            player.draw(screen)
+            drawn.append(player.draw(screen, alpha))
+        drawn.extend(self.projectiles.draw(screen, alpha))
+        if profiling:
+            start = profiler.add(SPRITES, start)
             
-        font = pygame.font.Font(None, 36)
-        
         minutes = int(self.time_remaining / 60000)
         seconds = int((self.time_remaining % 60000) / 1000)
         time_text = f"{minutes:02d}:{seconds:02d}"
-        time_surface = font.render(time_text, True, WHITE)
-        screen.blit(time_surface, (WINDOW_WIDTH/2 - time_surface.get_width()/2, 10))
-        
+        time_surface = fonts.render(time_text, 36, WHITE)
+        drawn.append(screen.blit(time_surface, (WINDOW_WIDTH/2 - time_surface.get_width()/2, 10)))
         for i, (player, player_data) in enumerate(zip(self.players, self.player_data)):
             score = self.calculate_score(i)
             text = f"{player_data['name']}: {score}"
             color = BLUE if i == 0 else RED
-            score_surface = font.render(text, True, color)
+            score_surface = fonts.render(text, 36, color)
             
             if i == 0:
                 x = 10
@@ -157,36 +303,49 @@ class Game:
             else:
                 x = WINDOW_WIDTH - score_surface.get_width() - 10
                 score_x = x
-                hearts_x = x - ((heart_size + 2) * 10) - 10
+                hearts_x = x - ((HEART_SIZE + 2) * 10) - 10
             
-            screen.blit(score_surface, (score_x, 10))
+            drawn.append(screen.blit(score_surface, (score_x, 10)))
             
             try:
-                heart_image = pygame.image.load("assets/coeur.png").convert_alpha()
-                heart_size = 20
-                heart_image = pygame.transform.scale(heart_image, (heart_size, heart_size))
+                heart_image = assets.get_scaled("assets/coeur.png", (HEART_SIZE, HEART_SIZE))
                 
-                health_percentage = player.health / player.character_class.stats['health']
+                health_percentage = player.health / player.stats.health
                 num_hearts = int(health_percentage * 10)
                 
                 heart_x = hearts_x
                 heart_y = 10
                 for _ in range(num_hearts):
-                    screen.blit(heart_image, (heart_x, heart_y))
+                    drawn.append(screen.blit(heart_image, (heart_x, heart_y)))
                     if i == 0:
-                        heart_x += heart_size + 2
+                        heart_x += HEART_SIZE + 2
                     else:
-                        heart_x += heart_size + 2
+                        heart_x += HEART_SIZE + 2
             except Exception as e:
                 print(f"Erreur lors du chargement de l'image du cœur: {e}")
         
         if self.game_over:
-            font = pygame.font.Font(None, 74)
             if self.winner >= 0:
                 text = f"{self.player_data[self.winner]['name']} GAGNE!"
             else:
                 text = "MATCH NUL!"
-            game_over_surface = font.render(text, True, WHITE)
-            screen.blit(game_over_surface,
+            game_over_surface = fonts.render(text, 74, WHITE)
+            drawn.append(screen.blit(game_over_surface,
                        (WINDOW_WIDTH/2 - game_over_surface.get_width()/2,
-                        WINDOW_HEIGHT/2 - game_over_surface.get_height()/2)) 
\ No newline at end of file
+                        WINDOW_HEIGHT/2 - game_over_surface.get_height()/2)))
+
+        if self.banner:
+            banner_surface = fonts.render(self.banner, FONT_SIZE_MEDIUM, YELLOW)
+            drawn.append(screen.blit(banner_surface, (WINDOW_WIDTH/2 - banner_surface.get_width()/2, 50)))
+
+        if self.full_redraw or len(drawn) + len(self.drawn_rects) > MAX_DIRTY_RECTS:
+            # Trop de petites zones : une mise à jour complète coûte moins cher
+            dirty = [screen.get_rect()]
+        else:
+            dirty = self.drawn_rects + drawn
+        self.drawn_rects = drawn
+        self.full_redraw = False
+        if profiling:
+            profiler.add(HUD, start)
+        return dirty
+ 
\ No newline at end of file
@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import random
+import argparse
+
+# Aucune fenêtre : la simulation tourne sans affichage
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from game import Game
+from database import Database
+from character_class import CharacterClass
+from maps import MapManager
+from input_providers import RandomInputProvider
+from replay import save_replay
+from constants import *
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Simulation de matchs sans affichage")
+    parser.add_argument("--matches", type=int, default=100, help="Nombre de matchs à simuler")
+    parser.add_argument("--seed", type=int, default=None, help="Graine aléatoire")
+    parser.add_argument("--map", dest="map_type", default=None, help="Carte imposée (aléatoire sinon)")
+    parser.add_argument("--classes", nargs=2, default=None, metavar=("J1", "J2"),
+                        help="Classes imposées (aléatoires sinon)")
+    parser.add_argument("--tick-rate", type=int, default=SIMULATION_HZ, help="Pas de simulation par seconde")
+    parser.add_argument("--projectiles", choices=("AUTO", "NUMPY", "PYTHON"), default=PROJECTILE_ENGINE,
+                        help="Moteur de projectiles")
+    parser.add_argument("--max-bullets", type=int, default=None,
+                        help="Projectiles vivants par joueur (limite de chaque classe sinon)")
+    parser.add_argument("--output", default=None, help="Fichier JSON Lines où écrire les matchs")
+    parser.add_argument("--db", default="headless_data.db",
+                        help="Base SQLite où enregistrer les matchs (ignorée si --output est donné)")
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="Matchs enregistrés ensemble dans la base")
+    parser.add_argument("--replays", default=None, help="Dossier où enregistrer le replay de chaque match")
+    return parser.parse_args()
+
+def run_match(game_settings, seed, tick_rate, record=False):
+    game = Game(game_settings, tick_rate=tick_rate, headless=True)
+    if record:
+        game.start_recording(seed)
+    provider = RandomInputProvider(seed, game)
+
+    while not game.game_over:
+        game.step(provider)
+    game.finish()
+
+    return game
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    class_types = list(CharacterClass.get_classes().keys())
+    map_types = list(MapManager.get_maps().keys())
+
+    db = None
+    output = None
+    if args.output:
+        output = open(args.output, "a")
+        player_data = [{'id': 1, 'name': 'BOT 1'}, {'id': 2, 'name': 'BOT 2'}]
+    else:
+        db = Database(args.db)
+        player_data = [{'id': db.add_player(name), 'name': name} for name in ("BOT 1", "BOT 2")]
+
+    wins = {class_type: 0 for class_type in class_types}
+    games = {class_type: 0 for class_type in class_types}
+    total_ticks = 0
+    pending = []
+
+    start = time.perf_counter()
+    try:
+        for index in range(args.matches):
+            classes = args.classes or [rng.choice(class_types), rng.choice(class_types)]
+            game_settings = {
+                'player_classes': {0: classes[0], 1: classes[1]},
+                'player_data': player_data,
+                'map_type': args.map_type or rng.choice(map_types),
+                'projectile_engine': args.projectiles,
+                'max_bullets': args.max_bullets
+            }
+
+            game = run_match(game_settings, rng.getrandbits(32), args.tick_rate, bool(args.replays))
+            total_ticks += game.tick
+            if args.replays:
+                save_replay(game.encode_replay(), args.replays, f"match-{index:05d}{REPLAY_EXTENSION}")
+
+            match_data = game.get_match_data()
+            if output:
+                output.write(json.dumps({**match_data, 'map_type': game_settings['map_type']}) + "\n")
+            else:
+                # Les matchs sont enregistrés par blocs, chacun en une seule transaction
+                pending.append({**match_data, 'telemetry': game.telemetry.encode()})
+                if len(pending) >= args.batch_size:
+                    db.save_matches(pending)
+                    pending = []
+
+            for i, class_type in enumerate(classes):
+                games[class_type] += 1
+                if game.winner == i:
+                    wins[class_type] += 1
+    finally:
+        if output:
+            output.close()
+        if db:
+            if pending:
+                db.save_matches(pending)
+            db.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{args.matches} matchs en {elapsed:.2f} s")
+    print(f"{args.matches / elapsed:.1f} matchs/s, {total_ticks / elapsed:.0f} pas simulés/s")
+    for class_type in class_types:
+        if games[class_type]:
+            print(f"  {class_type:<10} {games[class_type]:>6} matchs  {wins[class_type] / games[class_type] * 100:5.1f}% victoires")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import math
+import random
+
+NO_INPUT = {
+    'dx': 0,
+    'dy': 0,
+    'fire': False,
+    'shield': False
+}
+
+class RandomInputProvider:
+    def __init__(self, seed=None, game=None, aim_chance=0.5, fire_chance=0.3, shield_chance=0.005,
+                 min_hold=10, max_hold=40):
+        self.rng = random.Random(seed)
+        self.game = game
+        self.aim_chance = aim_chance
+        self.fire_chance = fire_chance
+        self.shield_chance = shield_chance
+        self.min_hold = min_hold
+        self.max_hold = max_hold
+        self.current = [(0, 0), (0, 0)]
+        self.hold = [0, 0]
+
+    def _pick_direction(self, player_id):
+        if self.game and self.rng.random() < self.aim_chance:
+            # Se dirige vers l'adversaire pour provoquer des échanges de tirs
+            player = self.game.players[player_id]
+            other = self.game.players[1 - player_id]
+            angle = math.atan2(other.y - player.y, other.x - player.x)
+            return math.cos(angle), math.sin(angle)
+        return self.rng.choice((-1, 0, 1)), self.rng.choice((-1, 0, 1))
+
+    def get_player_input(self, player_id):
+        if self.hold[player_id] <= 0:
+            self.current[player_id] = self._pick_direction(player_id)
+            self.hold[player_id] = self.rng.randint(self.min_hold, self.max_hold)
+        self.hold[player_id] -= 1
+
+        dx, dy = self.current[player_id]
+        return {
+            'dx': dx,
+            'dy': dy,
+            'fire': self.rng.random() < self.fire_chance,
+            'shield': self.rng.random() < self.shield_chance
+        }
+
+class ScriptedInputProvider:
+    def __init__(self, scripts):
+        # scripts[player_id] : liste de (nombre de pas, entrées) jouée en boucle
+        self.scripts = scripts
+        self.positions = [-1, -1]
+        self.remaining = [0, 0]
+
+    def get_player_input(self, player_id):
+        script = self.scripts[player_id] if player_id < len(self.scripts) else None
+        if not script:
+            return NO_INPUT
+
+        if self.remaining[player_id] <= 0:
+            self.positions[player_id] = (self.positions[player_id] + 1) % len(script)
+            self.remaining[player_id] = script[self.positions[player_id]][0]
+        self.remaining[player_id] -= 1
+
+        return {**NO_INPUT, **script[self.positions[player_id]][1]}
+
+class ReplayInputProvider:
+    def __init__(self, source, game):
+        # source : Replay chargé ou ReplayRecorder d'une partie en cours. Game.step lit les deux
+        # joueurs à chaque pas tant que le match dure, l'entrée se retrouve donc à partir du pas :
+        # rien à resynchroniser après un retour en arrière vers une sauvegarde
+        self.source = source
+        self.game = game
+
+    def get_player_input(self, player_id):
+        index = 2 * (self.game.tick - 1) + player_id
+        if index >= len(self.source):
+            return NO_INPUT
+        return self.source.get_input(index)
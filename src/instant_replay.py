@@ -0,0 +1,36 @@
+from game import Game
+from input_providers import ReplayInputProvider
+from constants import *
+
+class InstantReplay:
+    # Les dernières secondes d'un match enregistré (Game.start_recording), rejouées dans une
+    # partie à part depuis la sauvegarde la plus proche
+    def __init__(self, game, seconds=INSTANT_REPLAY_SECONDS):
+        self.end_tick = game.tick
+        end_of_fight = game.tick if game.end_time is None else round(game.end_time / game.step_ms)
+        start_tick = max(0, end_of_fight - int(seconds * game.tick_rate))
+        # Le début de la fenêtre a pu être oublié (SNAPSHOT_BUFFER_BYTES) : on part alors de la plus ancienne sauvegarde
+        oldest = game.snapshots.oldest_tick()
+        if oldest is not None:
+            start_tick = max(start_tick, oldest)
+
+        self.game = Game(game.game_settings, tick_rate=game.tick_rate, headless=game.headless)
+        self.game.banner = "REPLAY"
+        self.provider = ReplayInputProvider(game.replay, self.game)
+        self.done = not game.snapshots.seek(self.game, start_tick, self.provider)
+
+    @staticmethod
+    def available(game):
+        return game.replay is not None and game.snapshots is not None and len(game.snapshots) > 0
+
+    def update(self, elapsed_ms):
+        for _ in range(min(self.game.timestep.advance(elapsed_ms), self.end_tick - self.game.tick)):
+            self.game.step(self.provider)
+        if self.game.tick >= self.end_tick:
+            self.done = True
+
+    def draw(self, screen):
+        return self.game.draw(screen)
+
+    def invalidate(self):
+        self.game.invalidate()
@@ -1,26 +1,42 @@
 import pygame
 import sys
+from time import perf_counter_ns
 from game import Game
 from input_handler import InputHandler
 from menu import Menu
 from database import Database
+from assets import assets
+from replay import save_replay
+from instant_replay import InstantReplay
+from spectators import SpectatorPublisher
+from profiler import profiler, EVENTS, DISPLAY
 from constants import *
 
 def main():
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption(GAME_TITLE)
+    assets.preload()
     clock = pygame.time.Clock()
     
     fullscreen = False
     
     MENU = "MENU"
     PLAYING = "PLAYING"
+    INSTANT_REPLAY = "INSTANT_REPLAY"
     current_state = MENU
     
     db = Database()
     menu = Menu(db)
     input_handler = None
     game = None
+    highlight = None
+    
+    publisher = None
+    if SPECTATOR_ENABLED:
+        try:
+            publisher = SpectatorPublisher()
+        except OSError as e:
+            print(f"Diffusion aux spectateurs indisponible: {e}")
     
     pygame.init()
     pygame.joystick.init()
@@ -33,9 +49,15 @@ def main():
         joysticks.append(joystick)
 
     print(f"Nombre de joysticks connectés : {joystick_count}")
+    
+    elapsed_ms = 0
 
     try:
         while True:
+            profiler.begin_frame()
+            profiling = profiler.enabled
+            if profiling:
+                start = perf_counter_ns()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     db.close()
@@ -44,6 +66,9 @@ def main():
                     if event.key == pygame.K_ESCAPE:
                         if current_state == PLAYING:
                             current_state = MENU
+                        elif current_state == INSTANT_REPLAY:
+                            current_state = MENU
+                            highlight = None
                         else:
                             db.close()
                             return
@@ -53,6 +78,28 @@ def main():
                             screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
                         else:
                             screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+                        if game:
+                            game.invalidate()
+                        if highlight:
+                            highlight.invalidate()
+                    elif event.key == PROFILER_KEY:
+                        profiler.toggle()
+                        # Le panneau apparu ou disparu doit être effacé de l'écran
+                        if game:
+                            game.invalidate()
+                        if highlight:
+                            highlight.invalidate()
+                    elif event.key == PROFILER_RESET_KEY:
+                        profiler.reset()
+                    elif event.key in (PROFILER_TRACE_KEY, PROFILER_CPROFILE_KEY):
+                        # Les fichiers portent l'écran du menu ou l'état du jeu au moment de la capture
+                        tag = menu.state if current_state == MENU else current_state
+                        if event.key == PROFILER_CPROFILE_KEY:
+                            profiler.start_cprofile(tag)
+                        elif profiler.trace is None:
+                            profiler.start_trace(tag)
+                        else:
+                            profiler.stop_trace()
                 elif event.type == pygame.JOYBUTTONDOWN:
                     if event.joy == 0 and event.button == 1:
                         fullscreen = not fullscreen
@@ -60,6 +107,10 @@ def main():
                             screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
                         else:
                             screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+                        if game:
+                            game.invalidate()
+                        if highlight:
+                            highlight.invalidate()
                     print(f"Button {event.button} pressed on joystick {event.joy}")
                 elif event.type == pygame.JOYAXISMOTION:
                     print(f"Joystick {event.joy} axis {event.axis} moved to {event.value}")
@@ -86,25 +137,65 @@ def main():
                         input_handler = InputHandler()
                         input_handler.input_mode = menu.settings['input_mode']
                         game = Game(menu.get_game_settings())
+                        game.start_recording()
+                        game.publisher = publisher
+            if profiling:
+                profiler.add(EVENTS, start)
             
             if current_state == MENU:
                 menu.draw(screen)
+                if profiler.visible:
+                    profiler.draw(screen)
+                if profiling:
+                    start = perf_counter_ns()
+                pygame.display.flip()
+                if profiling:
+                    profiler.add(DISPLAY, start)
             elif current_state == PLAYING:
-                game.update(input_handler)
-                game.draw(screen)
+                game.update(input_handler, elapsed_ms)
+                # Seules les zones modifiées sont envoyées à l'écran
+                dirty = game.draw(screen)
+                if profiler.visible:
+                    dirty.append(profiler.draw(screen))
+                if profiling:
+                    start = perf_counter_ns()
+                pygame.display.update(dirty)
+                if profiling:
+                    profiler.add(DISPLAY, start)
                 
                 if game.return_to_menu:
-                    db.save_match(game.get_match_data())
+                    # La télémétrie n'est compressée qu'une fois le match terminé
+                    db.save_match({**game.get_match_data(), 'telemetry': game.telemetry.encode()})
+                    save_replay(game.encode_replay())
                     current_state = MENU
                     menu.set_state("MAIN")
+                    if InstantReplay.available(game):
+                        # Les dernières secondes du combat, rejouées avant le retour au menu
+                        highlight = InstantReplay(game)
+                        current_state = INSTANT_REPLAY
                     game = None
+            elif current_state == INSTANT_REPLAY:
+                highlight.update(elapsed_ms)
+                dirty = highlight.draw(screen)
+                if profiler.visible:
+                    dirty.append(profiler.draw(screen))
+                if profiling:
+                    start = perf_counter_ns()
+                pygame.display.update(dirty)
+                if profiling:
+                    profiler.add(DISPLAY, start)
+                if highlight.done:
+                    current_state = MENU
+                    highlight = None
             
-            pygame.display.flip()
-            clock.tick(FPS)
+            elapsed_ms = clock.tick(FPS)
             
     finally:
+        profiler.stop_captures()
         if input_handler:
             input_handler.cleanup()
+        if publisher:
+            publisher.close()
         db.close()
         pygame.quit()
         
@@ -1,73 +1,190 @@
+import os
+import json
+import pickle
+import hashlib
 from obstacle import Obstacle
 from constants import *
 
+# À incrémenter quand le format compilé change
+MAP_CACHE_VERSION = 1
+
 class Map:
-    def __init__(self, name, description):
+    def __init__(self, name, description, path=None):
         self.name = name
         self.description = description
-        self.obstacles = []
-        
+        self.path = path
+        self.loaded_obstacles = [] if path is None else None
+        self.previews = {}
+
+    @property
+    def obstacles(self):
+        # Les obstacles d'une carte ne sont chargés qu'au premier accès
+        if self.loaded_obstacles is None:
+            self.loaded_obstacles = MapManager.build_obstacles(self.path)
+        return self.loaded_obstacles
+
+    @obstacles.setter
+    def obstacles(self, obstacles):
+        self.loaded_obstacles = obstacles
+
     def draw_preview(self, screen, preview_rect):
         pygame.draw.rect(screen, BLACK, preview_rect)
         pygame.draw.rect(screen, WHITE, preview_rect, 2)
-        
+
         for obstacle in self.obstacles:
             obstacle.draw_preview(screen, preview_rect)
 
+    def signature(self):
+        return tuple((tuple(obstacle.original_rect), obstacle.type, obstacle.rotation)
+                     for obstacle in self.obstacles)
+
+    def get_preview(self, size):
+        # Miniature rendue une seule fois par taille, refaite si les obstacles changent
+        size = (int(size[0]), int(size[1]))
+        signature = self.signature()
+        cached = self.previews.get(size)
+        if cached is None or cached[0] != signature:
+            surface = pygame.Surface(size).convert()
+            self.draw_preview(surface, surface.get_rect())
+            cached = (signature, surface)
+            self.previews[size] = cached
+        return cached[1]
+
 class MapManager:
+    # Cartes décrites dans MAPS_DIR (un fichier JSON par carte) et compilées dans MAP_CACHE_DIR
+    catalogue = None
+    compiled = {}
+
     @staticmethod
     def get_maps():
-        maps = {
-            'CLASSIC': Map('Classique', ''),
-            'ARENA': Map('Arène', ''),
-            'MAZE': Map('Tactique', '')
+        maps = {}
+        for header, path in MapManager.get_catalogue():
+            maps[header['id']] = Map(header['name'], header['description'], path)
+        return maps
+
+    @staticmethod
+    def get_catalogue():
+        # Seuls les en-têtes sont lus ; ils sont gardés en cache tant que les fichiers ne changent pas
+        catalogue_path = os.path.join(MAP_CACHE_DIR, "catalogue.bin")
+        entries = MapManager.catalogue
+        if entries is None:
+            cached = MapManager.read_cache(catalogue_path) or {}
+            if cached.get('version') != MAP_CACHE_VERSION:
+                cached = {}
+            entries = cached.get('entries', {})
+
+        try:
+            names = sorted(name for name in os.listdir(MAPS_DIR) if name.endswith(".json"))
+        except OSError as e:
+            print(f"Dossier des cartes introuvable: {e}")
+            return []
+
+        catalogue = {}
+        changed = len(names) != len(entries)
+        for name in names:
+            path = os.path.join(MAPS_DIR, name)
+            stat = os.stat(path)
+            entry = entries.get(name)
+            if entry is None or entry[0] != (stat.st_mtime_ns, stat.st_size):
+                try:
+                    with open(path, encoding="utf-8") as file:
+                        data = json.load(file)
+                except (OSError, ValueError) as e:
+                    print(f"Carte illisible {path}: {e}")
+                    continue
+                entry = ((stat.st_mtime_ns, stat.st_size), MapManager.read_header(data, name))
+                changed = True
+            catalogue[name] = entry
+
+        if changed:
+            MapManager.write_cache(catalogue_path, {'version': MAP_CACHE_VERSION, 'entries': catalogue})
+        MapManager.catalogue = catalogue
+
+        headers = [(entry[1], os.path.join(MAPS_DIR, name)) for name, entry in catalogue.items()]
+        return sorted(headers, key=lambda item: (item[0]['order'], item[0]['id']))
+
+    @staticmethod
+    def read_header(data, file_name):
+        return {
+            'id': data.get('id', os.path.splitext(file_name)[0].upper()),
+            'name': data.get('name', file_name),
+            'description': data.get('description', ''),
+            'order': data.get('order', 0)
         }
 
-        maps['CLASSIC'].obstacles = [
-            Obstacle(0.48, 0.2, 0.04, 0.6, "WALL"),
-            Obstacle(0.2, 0.2, 0.15, 0.15, "SLOW"),
-            Obstacle(0.65, 0.65, 0.15, 0.15, "SLOW"),
-            Obstacle(0.15, 0.4, 0.1, 0.05, "WALL"),
-            Obstacle(0.75, 0.55, 0.1, 0.05, "WALL")
-        ]
-
-        maps['ARENA'].obstacles = [
-            Obstacle(0.2, 0.2, 0.2, 0.05, "WALL"),
-            Obstacle(0.2, 0.2, 0.05, 0.2, "WALL"),
-            Obstacle(0.6, 0.75, 0.2, 0.05, "WALL"),
-            Obstacle(0.75, 0.6, 0.05, 0.2, "WALL"),
-            Obstacle(0.45, 0.45, 0.1, 0.1, "SLOW"),
-            Obstacle(0.15, 0.75, 0.1, 0.1, "SLOW"),
-            Obstacle(0.75, 0.15, 0.1, 0.1, "SLOW")
-        ]
-
-        maps['MAZE'].obstacles = [
-            Obstacle(0.3, 0.3, 0.05, 0.2, "WALL", 45),
-            Obstacle(0.65, 0.3, 0.05, 0.2, "WALL", -45),
-            Obstacle(0.3, 0.7, 0.05, 0.2, "WALL", -45),
-            Obstacle(0.65, 0.7, 0.05, 0.2, "WALL", 45),
-            Obstacle(0.45, 0.2, 0.1, 0.1, "SLOW"),
-            Obstacle(0.45, 0.7, 0.1, 0.1, "SLOW"),
-            Obstacle(0.2, 0.45, 0.1, 0.1, "SLOW"),
-            Obstacle(0.7, 0.45, 0.1, 0.1, "SLOW")
-        ]
+    @staticmethod
+    def load_compiled(path):
+        # Le cache est valide si le fichier source n'a pas bougé (date) ou a le même contenu (empreinte)
+        stat = os.stat(path)
+        compiled = MapManager.compiled.get(path)
+        if compiled and compiled['mtime'] == stat.st_mtime_ns:
+            return compiled
 
-        return maps
+        cache_path = os.path.join(MAP_CACHE_DIR, os.path.splitext(os.path.basename(path))[0] + ".bin")
+        compiled = MapManager.read_cache(cache_path)
+        if (compiled is None or compiled.get('version') != MAP_CACHE_VERSION or
+                compiled.get('window') != (WINDOW_WIDTH, WINDOW_HEIGHT)):
+            compiled = None
+
+        if compiled is None or compiled['mtime'] != stat.st_mtime_ns:
+            with open(path, "rb") as file:
+                source = file.read()
+            digest = hashlib.sha1(source).hexdigest()
+            if compiled is None or compiled['digest'] != digest:
+                compiled = MapManager.compile_map(json.loads(source.decode("utf-8")), path)
+                compiled['digest'] = digest
+            compiled['mtime'] = stat.st_mtime_ns
+            MapManager.write_cache(cache_path, compiled)
+
+        MapManager.compiled[path] = compiled
+        return compiled
 
     @staticmethod
-    def create_obstacles(map_name, screen_width, screen_height):
-        maps = MapManager.get_maps()
-        if map_name not in maps:
-            return []
-            
+    def compile_map(data, path):
         obstacles = []
-        for obs in maps[map_name].obstacles:
-            x = obs.original_rect.x
-            y = obs.original_rect.y
-            width = obs.original_rect.width
-            height = obs.original_rect.height
-            
-            new_obstacle = Obstacle(x, y, width, height, obs.type, obs.rotation)
-            obstacles.append(new_obstacle)
-            
-        return obstacles 
\ No newline at end of file
+        for entry in data.get('obstacles', []):
+            obstacle = Obstacle(entry['x'], entry['y'], entry['width'], entry['height'],
+                                entry.get('type', "WALL"), entry.get('rotation', 0))
+            obstacles.append(obstacle.compile())
+        return {
+            'version': MAP_CACHE_VERSION,
+            'window': (WINDOW_WIDTH, WINDOW_HEIGHT),
+            'header': MapManager.read_header(data, os.path.basename(path)),
+            'obstacles': obstacles
+        }
+
+    @staticmethod
+    def build_obstacles(path):
+        # Des obstacles neufs à chaque appel : une partie peut les déplacer sans toucher au cache
+        obstacles = []
+        for rect, obstacle_type, rotation, prebaked in MapManager.load_compiled(path)['obstacles']:
+            x, y, width, height = rect
+            obstacles.append(Obstacle(x, y, width, height, obstacle_type, rotation, prebaked))
+        return obstacles
+
+    @staticmethod
+    def read_cache(cache_path):
+        try:
+            with open(cache_path, "rb") as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+
+    @staticmethod
+    def write_cache(cache_path, data):
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temporary_path = cache_path + ".tmp"
+            with open(temporary_path, "wb") as file:
+                pickle.dump(data, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, cache_path)
+        except OSError as e:
+            print(f"Impossible d'écrire le cache des cartes: {e}")
+
+    @staticmethod
+    def create_obstacles(map_name, screen_width, screen_height):
+        # Seule la carte demandée est chargée
+        for header, path in MapManager.get_catalogue():
+            if header['id'] == map_name:
+                return MapManager.build_obstacles(path)
+        return []
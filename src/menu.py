@@ -4,13 +4,16 @@ from constants import *
 from character_class import CharacterClass
 from database import Database
 from maps import MapManager
+from assets import assets
+from fonts import fonts
 
 class Button:
     def __init__(self, x, y, width, height, text, font_size=36, image_path=None):
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
         self.font_size = font_size
-        self.font = pygame.font.Font(None, self.calculate_font_size(width, height, font_size))
+        self.font_pixels = self.calculate_font_size(width, height, font_size)
+        self.font = fonts.get(self.font_pixels)
         self.color = (30, 30, 30)
         self.hover_color = (45, 45, 45)
         self.text_color = WHITE
@@ -23,20 +26,18 @@ class Button:
         
         if image_path:
             try:
-                original_image = pygame.image.load(image_path).convert_alpha()
-                img_width, img_height = original_image.get_size()
+                img_width, img_height = assets.get(image_path).get_size()
                 ratio = min(width / img_width, height / img_height)
                 new_width = int(img_width * ratio)
                 new_height = int(img_height * ratio)
                 
-                self.image = pygame.transform.scale(original_image, (new_width, new_height))
-                self.original_image = self.image.copy()
+                self.image = assets.get_scaled(image_path, (new_width, new_height))
                 
                 self.image_rect = self.image.get_rect(center=self.rect.center)
                 
                 hover_width = int(new_width * self.hover_scale)
                 hover_height = int(new_height * self.hover_scale)
-                self.hover_image = pygame.transform.scale(original_image, (hover_width, hover_height))
+                self.hover_image = assets.get_scaled(image_path, (hover_width, hover_height))
                 self.hover_image_rect = self.hover_image.get_rect(center=self.rect.center)
             except Exception as e:
                 print(f"Erreur lors du chargement de l'image: {e}")
@@ -55,7 +56,7 @@ class Button:
         else:
             color = self.hover_color if self.is_hovered else self.color
             pygame.draw.rect(screen, color, self.rect, border_radius=10)
-            text_surface = self.font.render(self.text, True, self.text_color)
+            text_surface = fonts.render(self.text, self.font_pixels, self.text_color)
             text_rect = text_surface.get_rect(center=self.rect.center)
             screen.blit(text_surface, text_rect)
 
@@ -79,7 +80,7 @@ class TextInput:
         self.text = ""
         self.placeholder = placeholder
         self.max_length = max_length
-        self.font = pygame.font.Font(None, 36)
+        self.font = fonts.get(36)
         self.active = False
         self.cursor_visible = True
         self.cursor_timer = 0
@@ -101,7 +102,7 @@ class TextInput:
         
         text_to_render = self.text if self.text else self.placeholder
         text_color = BLACK if self.text else (128, 128, 128)
-        text_surface = self.font.render(text_to_render, True, text_color)
+        text_surface = fonts.render(text_to_render, 36, text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
         
@@ -180,8 +181,7 @@ class Menu:
         self.keyboard_navigation = True
         
         try:
-            self.background = pygame.image.load("assets/background.png").convert()
-            self.background = pygame.transform.scale(self.background, (WINDOW_WIDTH, WINDOW_HEIGHT))
+            self.background = assets.get_scaled("assets/background.png", (WINDOW_WIDTH, WINDOW_HEIGHT), alpha=False)
         except:
             self.background = None
             print("Image de fond non trouvée. Placez une image 'background.png' dans le dossier assets/")
@@ -241,7 +241,7 @@ class Menu:
         for i, (class_type, class_info) in enumerate(classes.items()):
             self.class_buttons.append({
                 'button': Button(x_start + i * x_spacing - BUTTON_WIDTH//2, y_pos + WINDOW_HEIGHT*0.15,
-                               BUTTON_WIDTH, BUTTON_HEIGHT, class_info['name'], FONT_SIZE_MEDIUM),
+                               BUTTON_WIDTH, BUTTON_HEIGHT, class_info.name, FONT_SIZE_MEDIUM),
                 'type': class_type,
                 'preview_pos': (x_start + i * x_spacing, y_pos)
             })
@@ -305,8 +305,7 @@ class Menu:
         else:
             screen.fill(BLACK)
         
-        title_font = pygame.font.Font(None, FONT_SIZE_LARGE)
-        title = title_font.render("SPACE DUEL", True, WHITE)
+        title = fonts.render("SPACE DUEL", FONT_SIZE_LARGE, WHITE)
         title_rect = title.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT*0.2))
         screen.blit(title, title_rect)
         
@@ -319,8 +318,7 @@ class Menu:
     def draw_settings(self, screen):
         screen.fill(BLACK)
         
-        title_font = pygame.font.Font(None, FONT_SIZE_LARGE)
-        title = title_font.render("PARAMETRES", True, WHITE)
+        title = fonts.render("PARAMETRES", FONT_SIZE_LARGE, WHITE)
         title_rect = title.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT*0.2))
         screen.blit(title, title_rect)
         
@@ -344,9 +342,9 @@ class Menu:
     def draw_class_select(self, screen):
         screen.fill(BLACK)
         
-        title = pygame.font.Font(None, FONT_SIZE_LARGE).render(
+        title = fonts.render(
             f"JOUEUR {self.player_data[self.current_player_selecting]['name']} - CLASSE",
-            True, GOLD)
+            FONT_SIZE_LARGE, GOLD)
         title_rect = title.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT*0.1))
         
         glow_surf = pygame.Surface((title.get_width() + 20, title.get_height() + 20), pygame.SRCALPHA)
@@ -380,7 +378,7 @@ class Menu:
     def draw_map_select(self, screen):
         screen.fill(BLACK)
         
-        title = pygame.font.Font(None, FONT_SIZE_LARGE).render("SELECTION DE LA MAP", True, GOLD)
+        title = fonts.render("SELECTION DE LA MAP", FONT_SIZE_LARGE, GOLD)
         title_rect = title.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT*0.1))
         
         glow_surf = pygame.Surface((title.get_width() + 20, title.get_height() + 20), pygame.SRCALPHA)
@@ -404,14 +402,13 @@ class Menu:
             pygame.draw.rect(screen, (30, 30, 30), preview_rect.inflate(20, 20), border_radius=10)
             pygame.draw.rect(screen, LIGHT_BLUE, preview_rect.inflate(20, 20), width=1, border_radius=10)
             
-            self.maps[map_type].draw_preview(screen, preview_rect)
+            screen.blit(self.maps[map_type].get_preview(preview_rect.size), preview_rect)
             
             desc_surface = pygame.Surface((preview_width, 30), pygame.SRCALPHA)
             desc_surface.fill((0, 0, 0, 180))
             screen.blit(desc_surface, (preview_rect.x, preview_rect.bottom + 10))
             
-            font = pygame.font.Font(None, FONT_SIZE_SMALL)
-            desc = font.render(self.maps[map_type].description, True, WHITE)
+            desc = fonts.render(self.maps[map_type].description, FONT_SIZE_SMALL, WHITE)
             desc_rect = desc.get_rect(center=(x, preview_rect.bottom + 25))
             screen.blit(desc, desc_rect)
             
@@ -423,8 +420,7 @@ class Menu:
 
     def draw_player_select(self, screen):
         screen.fill(BLACK)
-        title = pygame.font.Font(None, FONT_SIZE_LARGE).render(
-            "ENTREZ VOTRE NOM", True, WHITE)
+        title = fonts.render("ENTREZ VOTRE NOM", FONT_SIZE_LARGE, WHITE)
         screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, WINDOW_HEIGHT*0.2))
         
         self.player_name_input.draw(screen)
@@ -435,7 +431,7 @@ class Menu:
     def draw_leaderboard(self, screen):
         screen.fill(BLACK)
         
-        title = pygame.font.Font(None, FONT_SIZE_LARGE).render("CLASSEMENT", True, GOLD)
+        title = fonts.render("CLASSEMENT", FONT_SIZE_LARGE, GOLD)
         title_rect = title.get_rect(center=(WINDOW_WIDTH//2, 50))
         
         glow_surf = pygame.Surface((title.get_width() + 20, title.get_height() + 20), pygame.SRCALPHA)
@@ -459,7 +455,7 @@ class Menu:
                         1)
         
         for header, width in zip(headers, header_widths):
-            text = pygame.font.Font(None, FONT_SIZE_MEDIUM).render(header, True, GOLD)
+            text = fonts.render(header, FONT_SIZE_MEDIUM, GOLD)
             screen.blit(text, (x, 130))
             x += total_width * width
         
@@ -475,7 +471,7 @@ class Menu:
             
             values = [f"{rank}. {name}", str(games), str(wins), f"{win_rate}%", str(score)]
             for value, width in zip(values, header_widths):
-                text = pygame.font.Font(None, FONT_SIZE_MEDIUM).render(value, True, color)
+                text = fonts.render(value, FONT_SIZE_MEDIUM, color)
                 screen.blit(text, (x, y))
                 x += total_width * width
             y += 40
@@ -484,7 +480,7 @@ class Menu:
 
     def draw_rules(self, screen):
         screen.fill(BLACK)
-        title = pygame.font.Font(None, FONT_SIZE_LARGE).render("REGLES DU JEU", True, WHITE)
+        title = fonts.render("REGLES DU JEU", FONT_SIZE_LARGE, WHITE)
         screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, WINDOW_HEIGHT*0.1))
 
         rules_text = [
@@ -502,10 +498,9 @@ class Menu:
             "Joueur 2: Flèches pour se déplacer, ENTER pour tirer, CTRL pour le bouclier"
         ]
 
-        font = pygame.font.Font(None, FONT_SIZE_SMALL)
         y_pos = WINDOW_HEIGHT * 0.25
         for line in rules_text:
-            text = font.render(line, True, WHITE)
+            text = fonts.render(line, FONT_SIZE_SMALL, WHITE)
             screen.blit(text, (WINDOW_WIDTH//2 - text.get_width()//2, y_pos))
             y_pos += FONT_SIZE_SMALL * 0.8
 
@@ -515,9 +510,9 @@ class Menu:
 
     def draw_char_select(self, screen):
         screen.fill(BLACK)
-        title = pygame.font.Font(None, FONT_SIZE_LARGE).render(
+        title = fonts.render(
             f"JOUEUR {self.current_player_entering + 1} - SELECTIONNEZ VOTRE PERSONNAGE",
-            True, WHITE)
+            FONT_SIZE_LARGE, WHITE)
         screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, WINDOW_HEIGHT*0.1))
         
         pygame.draw.line(screen, WHITE, 
@@ -525,12 +520,10 @@ class Menu:
                         (WINDOW_WIDTH * 0.5, WINDOW_HEIGHT * 0.8),
                         2)
         
-        font = pygame.font.Font(None, FONT_SIZE_MEDIUM)
-        
-        new_text = font.render("NOUVEAU PERSONNAGE", True, WHITE)
+        new_text = fonts.render("NOUVEAU PERSONNAGE", FONT_SIZE_MEDIUM, WHITE)
         screen.blit(new_text, (WINDOW_WIDTH * 0.25 - new_text.get_width()/2, WINDOW_HEIGHT * 0.3))
         
-        existing_text = font.render("PERSONNAGES EXISTANTS", True, WHITE)
+        existing_text = fonts.render("PERSONNAGES EXISTANTS", FONT_SIZE_MEDIUM, WHITE)
         screen.blit(existing_text, (WINDOW_WIDTH * 0.75 - existing_text.get_width()/2, WINDOW_HEIGHT * 0.2))
         
         self.new_char_button.draw(screen)
@@ -554,8 +547,7 @@ class Menu:
     def draw_custom_class(self, screen):
         screen.fill(BLACK)
         
-        title_font = pygame.font.Font(None, FONT_SIZE_LARGE)
-        title = title_font.render("CUSTOM CLASS", True, WHITE)
+        title = fonts.render("CUSTOM CLASS", FONT_SIZE_LARGE, WHITE)
         title_rect = title.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT*0.2))
         screen.blit(title, title_rect)
         
@@ -0,0 +1,455 @@
+import os
+import sys
+import json
+import time
+import heapq
+import random
+import socket
+import struct
+import argparse
+import threading
+
+# --headless : pas de fenêtre, utile pour lancer deux bornes sur la même machine
+if "--headless" in sys.argv or "--self-test" in sys.argv:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from game import Game
+from snapshots import SnapshotBuffer
+from replay import Replay, encode_input, decode_input
+from input_providers import RandomInputProvider, ReplayInputProvider
+from constants import *
+
+NET_MAGIC = b"SN"
+# Signature, type, dernier pas adverse reçu sans trou, pas et empreinte de la dernière vérification,
+# premier pas des entrées jointes
+HEADER = struct.Struct("<2sBIIII")
+INPUT = struct.Struct("<bbB")
+PACKET_SIZE = 2048
+
+HELLO = 1
+START = 2
+READY = 3
+INPUTS = 4
+
+NEUTRAL = (0, 0, 0)
+
+class Channel:
+    # Socket UDP vers l'autre borne ; latence, gigue et pertes peuvent être simulées à l'envoi
+    def __init__(self, sock, address=None, latency_ms=0, jitter_ms=0, loss=0.0, seed=None, clock=time.monotonic):
+        self.sock = sock
+        self.sock.setblocking(False)
+        self.address = address
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.queue = []
+        self.sequence = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, data):
+        self.sent += 1
+        if self.loss and self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        if not self.latency_ms and not self.jitter_ms:
+            self.transmit(data)
+            return
+        deliver_at = self.clock() + (self.latency_ms + self.rng.uniform(0, self.jitter_ms)) / 1000
+        heapq.heappush(self.queue, (deliver_at, self.sequence, data))
+        self.sequence += 1
+
+    def flush(self):
+        now = self.clock()
+        while self.queue and self.queue[0][0] <= now:
+            self.transmit(heapq.heappop(self.queue)[2])
+
+    def transmit(self, data):
+        try:
+            self.sock.sendto(data, self.address)
+        except OSError:
+            # UDP : un paquet qui ne part pas est un paquet perdu, les suivants le remplacent
+            pass
+
+    def receive(self):
+        packets = []
+        while True:
+            try:
+                data, address = self.sock.recvfrom(PACKET_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                continue
+            if len(data) < HEADER.size or data[:2] != NET_MAGIC:
+                continue
+            if self.address is None or address == self.address:
+                packets.append((data, address))
+        return packets
+
+def control_packet(kind, payload=b""):
+    return HEADER.pack(NET_MAGIC, kind, 0, 0, 0, 0) + payload
+
+def host_handshake(channel, settings, timeout=NET_HANDSHAKE_TIMEOUT):
+    # L'hôte attend l'autre borne puis lui envoie les réglages du match jusqu'à ce qu'elle soit prête
+    deadline = time.monotonic() + timeout
+    payload = json.dumps(settings).encode("utf-8")
+    while time.monotonic() < deadline:
+        for data, address in channel.receive():
+            kind = data[2]
+            if kind == HELLO:
+                channel.address = address
+            elif kind in (READY, INPUTS) and address == channel.address:
+                return True
+        if channel.address is not None:
+            channel.send(control_packet(START, payload))
+        time.sleep(0.02)
+    return False
+
+def join_handshake(channel, timeout=NET_HANDSHAKE_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        channel.send(control_packet(HELLO))
+        for data, address in channel.receive():
+            if data[2] == START:
+                settings = json.loads(data[HEADER.size:].decode("utf-8"))
+                channel.send(control_packet(READY))
+                return settings
+        time.sleep(0.02)
+    return None
+
+class NetSession:
+    # Seules les entrées circulent. Les entrées adverses manquantes sont prédites (l'adversaire
+    # garde ses dernières commandes) ; une prédiction fausse ramène la partie à la sauvegarde
+    # d'avant ce pas et la re-simule avec la bonne entrée
+    def __init__(self, game, channel, local_player, input_delay=NET_INPUT_DELAY, max_rollback=NET_MAX_ROLLBACK):
+        self.game = game
+        self.channel = channel
+        self.local_player = local_player
+        self.input_delay = input_delay
+        self.max_rollback = max_rollback
+
+        # Les premiers pas, avant l'arrivée des premières entrées retardées, sont neutres des deux côtés
+        self.local_inputs = {tick: NEUTRAL for tick in range(1, input_delay + 1)}
+        self.remote_inputs = dict(self.local_inputs)
+        self.last_local_tick = input_delay
+        self.confirmed_tick = input_delay  # Entrées adverses reçues sans trou jusqu'à ce pas
+        self.remote_ack = input_delay  # Entrées locales reçues par l'adversaire
+        self.used_remote = {}
+
+        self.checksums = {}
+        self.remote_checksums = {}
+        self.verified_tick = 0
+        self.desync_tick = None
+
+        self.snapshots = SnapshotBuffer(interval=1, max_count=max_rollback + 2)
+        self.snapshots.push(game.tick, game.save_snapshot())
+        self.rollbacks = 0
+        self.resimulated = 0
+        self.stalls = 0
+
+    @property
+    def finished(self):
+        # Fini quand plus aucune entrée adverse ne peut changer le résultat
+        game = self.game
+        return (game.return_to_menu and game.end_time is not None and
+                self.confirmed_tick >= round(game.end_time / game.step_ms))
+
+    def get_player_input(self, player_id):
+        tick = self.game.tick
+        if player_id == self.local_player:
+            return decode_input(*self.local_inputs[tick])
+        inputs = self.remote_inputs.get(tick)
+        if inputs is None:
+            inputs = self.remote_inputs[self.confirmed_tick]
+        self.used_remote[tick] = inputs
+        return decode_input(*inputs)
+
+    def update(self, input_handler):
+        # Un pas de simulation : réception, retour en arrière éventuel, pas suivant, envoi
+        self.channel.flush()
+        self.receive()
+        stepped = False
+        game = self.game
+        if not game.return_to_menu:
+            if game.tick + 1 - self.confirmed_tick > self.max_rollback:
+                # Trop d'avance sur l'adversaire : on l'attend plutôt que de prédire plus loin
+                self.stalls += 1
+            else:
+                # Les commandes de la borne sont celles du joueur 1 de son InputHandler
+                self.last_local_tick = game.tick + 1 + self.input_delay
+                self.local_inputs[self.last_local_tick] = encode_input(input_handler.get_player_input(0))
+                self.step()
+                stepped = True
+        self.send()
+        return stepped
+
+    def poll(self):
+        # Réseau seul, pour les images sans pas de simulation
+        self.channel.flush()
+        self.receive()
+        self.send()
+
+    def step(self):
+        game = self.game
+        game.step(self)
+        self.snapshots.push(game.tick, game.save_snapshot())
+        if game.tick % NET_CHECKSUM_INTERVAL == 0:
+            self.checksums[game.tick] = game.checksum()
+            if game.tick % (NET_CHECKSUM_INTERVAL * 10) == 0:
+                self.prune()
+
+    def receive(self):
+        rollback_tick = None
+        for data, _ in self.channel.receive():
+            magic, kind, ack, checksum_tick, checksum, first_tick = HEADER.unpack_from(data)
+            if kind == START:
+                # Notre READY s'est perdu : l'hôte attend encore
+                self.channel.send(control_packet(READY))
+                continue
+            if kind != INPUTS:
+                continue
+
+            self.remote_ack = max(self.remote_ack, ack)
+            if checksum_tick:
+                self.remote_checksums[checksum_tick] = checksum
+            payload = data[HEADER.size + 1:HEADER.size + 1 + data[HEADER.size] * INPUT.size]
+            for tick, inputs in enumerate(INPUT.iter_unpack(payload), first_tick):
+                if tick <= self.confirmed_tick or tick in self.remote_inputs:
+                    continue
+                self.remote_inputs[tick] = inputs
+                used = self.used_remote.get(tick)
+                if used is not None and used != inputs and (rollback_tick is None or tick < rollback_tick):
+                    rollback_tick = tick
+            while self.confirmed_tick + 1 in self.remote_inputs:
+                self.confirmed_tick += 1
+
+        if rollback_tick is not None and rollback_tick <= self.game.tick:
+            self.rollback(rollback_tick)
+        self.verify()
+
+    def rollback(self, tick):
+        game = self.game
+        target = game.tick
+        nearest = self.snapshots.nearest(tick - 1)
+        if nearest is None:
+            # Plus ancien que les sauvegardes gardées : l'état ne peut plus être corrigé
+            if self.desync_tick is None:
+                self.desync_tick = tick
+            return
+        saved_tick, data = nearest
+        game.load_snapshot(data)
+        for resimulated_tick in range(saved_tick + 1, target + 1):
+            self.used_remote.pop(resimulated_tick, None)
+        while game.tick < target:
+            self.step()
+        self.rollbacks += 1
+        self.resimulated += target - saved_tick
+
+    def verify(self):
+        # Les empreintes des pas dont les deux entrées sont connues ne changeront plus : on les compare
+        final_tick = min(self.confirmed_tick, self.game.tick)
+        self.verified_tick = final_tick - final_tick % NET_CHECKSUM_INTERVAL
+        for tick in [tick for tick in self.remote_checksums if tick <= final_tick]:
+            checksum = self.remote_checksums.pop(tick)
+            if tick in self.checksums and self.checksums[tick] != checksum and self.desync_tick is None:
+                self.desync_tick = tick
+                print(f"Désynchronisation détectée au pas {tick}")
+
+    def send(self):
+        first = self.remote_ack + 1
+        last = min(self.last_local_tick, first + NET_MAX_INPUTS_PER_PACKET - 1)
+        inputs = b"".join(INPUT.pack(*self.local_inputs[tick]) for tick in range(first, last + 1))
+        checksum = self.checksums.get(self.verified_tick, 0)
+        header = HEADER.pack(NET_MAGIC, INPUTS, self.confirmed_tick,
+                             self.verified_tick if checksum else 0, checksum, first)
+        self.channel.send(header + bytes((max(0, last - first + 1),)) + inputs)
+
+    def prune(self):
+        # Garde la fenêtre de retour en arrière et quelques secondes d'empreintes
+        floor = min(self.confirmed_tick, self.game.tick) - self.max_rollback - 1
+        for table, limit in ((self.remote_inputs, floor), (self.used_remote, floor),
+                             (self.local_inputs, min(floor, self.remote_ack)),
+                             (self.checksums, floor - NET_CHECKSUM_INTERVAL * 20),
+                             (self.remote_checksums, floor - NET_CHECKSUM_INTERVAL * 20)):
+            for tick in [tick for tick in table if tick < limit]:
+                del table[tick]
+
+    def linger(self, seconds=1.0):
+        # Continue d'envoyer nos dernières entrées le temps que l'adversaire termine aussi
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            self.poll()
+            time.sleep(1 / SIMULATION_HZ)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Match entre deux bornes en réseau (UDP)")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--host", action="store_true", help="Attend l'autre borne (joueur 1)")
+    mode.add_argument("--join", metavar="ADRESSE", help="Rejoint l'hôte à cette adresse (joueur 2)")
+    mode.add_argument("--self-test", action="store_true",
+                      help="Deux bornes dans ce processus, reliées par la boucle locale")
+    parser.add_argument("--port", type=int, default=NET_PORT, help="Port UDP de l'hôte")
+    parser.add_argument("--map", dest="map_type", default="CLASSIC", help="Carte (choisie par l'hôte)")
+    parser.add_argument("--classes", nargs=2, default=("BALANCED", "BALANCED"), metavar=("J1", "J2"),
+                        help="Classes des deux joueurs (choisies par l'hôte)")
+    parser.add_argument("--delay", type=int, default=NET_INPUT_DELAY, help="Retard des entrées locales en pas")
+    parser.add_argument("--latency", type=float, default=0, help="Latence simulée à l'envoi, en ms")
+    parser.add_argument("--jitter", type=float, default=0, help="Gigue simulée à l'envoi, en ms")
+    parser.add_argument("--loss", type=float, default=0, help="Proportion de paquets perdus à l'envoi")
+    parser.add_argument("--bot", type=int, default=None, metavar="GRAINE",
+                        help="Entrées locales aléatoires au lieu des commandes")
+    parser.add_argument("--headless", action="store_true", help="Sans fenêtre (avec --bot)")
+    parser.add_argument("--seed", type=int, default=1, help="Graine du test en boucle locale")
+    return parser.parse_args()
+
+def match_settings(args):
+    return {
+        'player_classes': list(args.classes),
+        'player_data': [{'id': None, 'name': "JOUEUR 1"}, {'id': None, 'name': "JOUEUR 2"}],
+        'map_type': args.map_type,
+        'projectile_engine': PROJECTILE_ENGINE,
+        'tick_rate': SIMULATION_HZ,
+        'input_delay': args.delay
+    }
+
+def create_game(settings, headless=True):
+    game_settings = {**settings, 'player_classes': dict(enumerate(settings['player_classes']))}
+    game = Game(game_settings, tick_rate=settings['tick_rate'], headless=headless)
+    game.start_recording()
+    return game
+
+def check_replay(game):
+    # Les entrées retenues par la session, rejouées hors ligne, doivent redonner le même état
+    replay = Replay.decode(game.encode_replay())
+    offline = Game(replay.settings, tick_rate=replay.tick_rate, headless=True)
+    provider = ReplayInputProvider(replay, offline)
+    while offline.tick < replay.ticks:
+        offline.step(provider)
+    return offline.checksum() == replay.checksum
+
+def self_test(args):
+    settings = match_settings(args)
+    host_channel = Channel(socket.socket(socket.AF_INET, socket.SOCK_DGRAM))
+    host_channel.sock.bind(("127.0.0.1", 0))
+    join_channel = Channel(socket.socket(socket.AF_INET, socket.SOCK_DGRAM), host_channel.sock.getsockname())
+    join_channel.sock.bind(("127.0.0.1", 0))
+
+    connected = []
+    thread = threading.Thread(target=lambda: connected.append(host_handshake(host_channel, settings, 5)))
+    thread.start()
+    joined = join_handshake(join_channel, 5)
+    thread.join()
+    if not connected or not connected[0] or joined is None:
+        print("Échec de la connexion en boucle locale")
+        return False
+
+    # Une horloge virtuelle : la latence simulée est mesurée en temps de jeu, le test va aussi vite que possible
+    now = [0.0]
+    for i, channel in enumerate((host_channel, join_channel)):
+        channel.latency_ms, channel.jitter_ms, channel.loss = args.latency, args.jitter, args.loss
+        channel.rng.seed(args.seed * 2 + i)
+        channel.clock = lambda: now[0]
+
+    sessions = [NetSession(create_game(settings), host_channel, 0, settings['input_delay']),
+                NetSession(create_game(settings), join_channel, 1, joined['input_delay'])]
+    bots = [RandomInputProvider(args.seed * 2 + i) for i in range(2)]
+
+    start = time.perf_counter()
+    frames = 0
+    while not all(session.finished for session in sessions) and frames < (GAME_DURATION // 1000 + 10) * SIMULATION_HZ * 4:
+        now[0] += 1 / SIMULATION_HZ
+        for session, bot in zip(sessions, bots):
+            session.update(bot)
+        frames += 1
+    elapsed = time.perf_counter() - start
+
+    checksums = [session.game.checksum() for session in sessions]
+    for name, session in zip(("Hôte", "Invité"), sessions):
+        channel = session.channel
+        print(f"{name}: {session.game.tick} pas, {session.rollbacks} retours en arrière "
+              f"({session.resimulated} pas re-simulés), {session.stalls} attentes, "
+              f"{channel.dropped}/{channel.sent} paquets perdus, empreinte {session.game.checksum():08x}")
+    finished = all(session.finished for session in sessions)
+    same_state = checksums[0] == checksums[1]
+    no_desync = all(session.desync_tick is None for session in sessions)
+    replays = all(check_replay(session.game) for session in sessions)
+    print(f"{frames} images en {elapsed:.2f} s, vainqueur {sessions[0].game.winner} / {sessions[1].game.winner}")
+    print(f"Terminé: {finished}  même état final: {same_state}  aucune désynchronisation: {no_desync}  "
+          f"replays identiques: {replays}")
+    for channel in (host_channel, join_channel):
+        channel.sock.close()
+    return finished and same_state and no_desync and replays
+
+def play(args):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if args.host:
+        sock.bind(("0.0.0.0", args.port))
+        channel = Channel(sock)
+        settings = match_settings(args)
+        print(f"En attente de l'autre borne sur le port {args.port}...")
+        if not host_handshake(channel, settings):
+            print("Personne ne s'est connecté")
+            return False
+        local_player = 0
+    else:
+        host, _, port = args.join.partition(":")
+        channel = Channel(sock, (socket.gethostbyname(host), int(port or args.port)))
+        settings = join_handshake(channel)
+        if settings is None:
+            print("Hôte injoignable")
+            return False
+        local_player = 1
+    channel.latency_ms, channel.jitter_ms, channel.loss = args.latency, args.jitter, args.loss
+
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption(GAME_TITLE)
+    game = create_game(settings, args.headless)
+    session = NetSession(game, channel, local_player, settings['input_delay'])
+
+    input_handler = None
+    if args.bot is not None:
+        local_input = RandomInputProvider(args.bot)
+    else:
+        from input_handler import InputHandler
+        input_handler = local_input = InputHandler()
+
+    clock = pygame.time.Clock()
+    elapsed_ms = 0
+    try:
+        while not session.finished:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    return False
+            steps = game.timestep.advance(elapsed_ms)
+            if steps == 0:
+                session.poll()
+            for _ in range(steps):
+                session.update(local_input)
+            pygame.display.update(game.draw(screen))
+            elapsed_ms = clock.tick(FPS)
+        session.linger()
+    finally:
+        if input_handler:
+            input_handler.cleanup()
+        sock.close()
+
+    print(f"{game.tick} pas, vainqueur {game.winner}, scores {game.scores}, empreinte {game.checksum():08x}")
+    print(f"{session.rollbacks} retours en arrière ({session.resimulated} pas re-simulés), "
+          f"{session.stalls} attentes, {channel.dropped}/{channel.sent} paquets perdus")
+    return session.desync_tick is None
+
+def main():
+    args = parse_args()
+    pygame.init()
+    try:
+        ok = self_test(args) if args.self_test else play(args)
+    finally:
+        pygame.quit()
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
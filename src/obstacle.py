@@ -1,8 +1,20 @@
 import pygame
+import math
+import zlib
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from constants import *
+from spatial_grid import UniformGrid
+from collision import ConvexPolygon, sweep_box, sweep_boxes
+
+def rect_bounds(rect):
+    return (rect.left, rect.top, rect.right, rect.bottom)
 
 class Obstacle:
-    def __init__(self, x, y, width, height, obstacle_type="WALL", rotation=0):
+    def __init__(self, x, y, width, height, obstacle_type="WALL", rotation=0, prebaked=None):
         if isinstance(x, float):
             x = int(x * WINDOW_WIDTH)
         if isinstance(y, float):
@@ -18,6 +30,7 @@ class Obstacle:
         self.rotation = rotation
         self.surface = None
         self.rotated_surface = None
+        self.polygon = None
         
         # Définition des propriétés selon le type
         if obstacle_type == "WALL":
@@ -31,21 +44,54 @@ class Obstacle:
             self.slow_factor = 0.5
             
         # Création de la surface de l'obstacle
-        self.update_surface()
+        self.update_surface(prebaked)
             
-    def update_surface(self):
+    def update_surface(self, prebaked=None):
         # Création d'une surface pour l'obstacle
         self.surface = pygame.Surface((self.original_rect.width, self.original_rect.height), pygame.SRCALPHA)
         pygame.draw.rect(self.surface, self.color, self.surface.get_rect())
         
-        if self.rotation != 0:
+        if self.rotation != 0 and prebaked is not None:
+            # Données précalculées par le cache des cartes : ni rotation ni trigonométrie
+            points, rect, pixels = prebaked
+            self.rect = pygame.Rect(rect)
+            self.rotated_surface = pygame.image.frombytes(zlib.decompress(pixels), self.rect.size, "RGBA")
+            self.polygon = ConvexPolygon(points)
+        elif self.rotation != 0:
             # Rotation de la surface
             self.rotated_surface = pygame.transform.rotate(self.surface, self.rotation)
-            # Mise à jour du rect pour la collision
+            # Le rect englobant sert au tri grossier, le polygone orienté au test exact
             self.rect = self.rotated_surface.get_rect(center=self.original_rect.center)
+            self.polygon = ConvexPolygon.from_rect(self.original_rect, self.rotation)
         else:
             self.rotated_surface = self.surface
             self.rect = self.original_rect
+            self.polygon = None
+            
+    def compile(self):
+        # Forme compacte et sérialisable de l'obstacle, relue par le constructeur
+        prebaked = None
+        if self.rotation != 0:
+            pixels = zlib.compress(pygame.image.tobytes(self.rotated_surface, "RGBA"))
+            prebaked = (self.polygon.points, tuple(self.rect), pixels)
+        return (tuple(self.original_rect), self.type, self.rotation, prebaked)
+            
+    def get_bounds(self):
+        # Boîte englobante exacte pour le tri grossier (le rect de la surface tournée est arrondi)
+        if self.polygon is not None:
+            return self.polygon.bounds
+        return rect_bounds(self.rect)
+        
+    def collides_rect(self, rect):
+        if self.polygon is not None:
+            return self.polygon.intersects_rect(rect)
+        return rect.colliderect(self.rect)
+        
+    def sweep_box(self, x0, y0, x1, y1, half_w, half_h):
+        # Instant d'impact d'une boîte en mouvement pendant le pas, ou None
+        if self.polygon is not None:
+            return self.polygon.sweep_box(x0, y0, x1, y1, half_w, half_h)
+        return sweep_box(x0, y0, x1, y1, half_w, half_h, rect_bounds(self.rect))
             
     def draw(self, screen):
         screen.blit(self.rotated_surface, self.rect)
@@ -84,6 +130,8 @@ class ObstacleManager:
             self.obstacles = MapManager.create_obstacles(map_type, WINDOW_WIDTH, WINDOW_HEIGHT)
         else:
             self.create_default_layout()
+        self.revision = 0
+        self.build_index()
         
     def create_default_layout(self):
         # Murs centraux
@@ -111,25 +159,183 @@ class ObstacleManager:
                     WINDOW_HEIGHT - 100 - wall_length, wall_thickness, wall_length)
         ])
         
-    def check_collision(self, rect):
+    def build_index(self):
+        # Grille construite une fois au chargement de la carte
+        cell_size = OBSTACLE_GRID_CELL_SIZE
+        self.grid = UniformGrid(cell_size)
+        self.bullet_half_size = BULLET_SIZE / 2
+        self.bullet_grid = UniformGrid(cell_size,
+                                       math.ceil(WINDOW_WIDTH / cell_size),
+                                       math.ceil(WINDOW_HEIGHT / cell_size))
+        self.bullet_table = None
+        self.bullet_polygon_ids = {}
+        self.bullet_polygon_owners = []
+        
         for obstacle in self.obstacles:
-            if obstacle.blocks_movement and rect.colliderect(obstacle.rect):
+            self.grid.insert(obstacle, obstacle.get_bounds())
+            if obstacle.blocks_bullets:
+                self.bullet_grid.insert(obstacle, self.get_bullet_bounds(obstacle))
+                
+        # L'extérieur de l'arène arrête aussi les projectiles
+        far = float(max(WINDOW_WIDTH, WINDOW_HEIGHT) * 10)
+        self.arena_bounds = {
+            "ARENA_LEFT": (-far, -far, 0, far),
+            "ARENA_RIGHT": (WINDOW_WIDTH, -far, far, far),
+            "ARENA_TOP": (-far, -far, far, 0),
+            "ARENA_BOTTOM": (-far, WINDOW_HEIGHT, far, far)
+        }
+        for name, bounds in self.arena_bounds.items():
+            self.bullet_grid.insert(name, bounds)
+        
+        # Sur une petite carte, parcourir la liste coûte moins cher que la grille
+        if len(self.obstacles) >= OBSTACLE_GRID_MIN_OBSTACLES:
+            self.query_rect = self.grid.query_rect
+        else:
+            self.query_rect = lambda rect: self.obstacles
+        
+    def get_bullet_bounds(self, obstacle):
+        # Mur élargi de la demi-taille d'un projectile : le test devient un test de point
+        half = self.bullet_half_size
+        left, top, right, bottom = obstacle.get_bounds()
+        return (left - half, top - half, right + half, bottom + half)
+        
+    def move_obstacle(self, obstacle, x, y, rotation=None):
+        obstacle.original_rect.topleft = (x, y)
+        if rotation is not None:
+            obstacle.rotation = rotation
+        obstacle.update_surface()
+        self.revision += 1
+        
+        # Seules les cellules concernées par le déplacement sont mises à jour
+        self.grid.update(obstacle, obstacle.get_bounds())
+        if obstacle.blocks_bullets:
+            self.bullet_grid.update(obstacle, self.get_bullet_bounds(obstacle))
+        
+    def check_collision(self, rect):
+        for obstacle in self.query_rect(rect):
+            if obstacle.blocks_movement and obstacle.collides_rect(rect):
                 return True
         return False
         
     def check_bullet_collision(self, bullet_rect):
-        for obstacle in self.obstacles:
-            if obstacle.blocks_bullets and bullet_rect.colliderect(obstacle.rect):
+        for obstacle in self.query_rect(bullet_rect):
+            if obstacle.blocks_bullets and obstacle.collides_rect(bullet_rect):
                 return True
         return False
         
+    def sweep_bullet(self, x0, y0, x1, y1):
+        # Premier instant d'impact (0 à 1) d'un projectile sur son trajet du pas, ou None
+        half = self.bullet_half_size
+        left, top = math.floor(min(x0, x1) - half), math.floor(min(y0, y1) - half)
+        right, bottom = math.ceil(max(x0, x1) + half), math.ceil(max(y0, y1) + half)
+        first = None
+        for obstacle in self.query_rect(pygame.Rect(left, top, right - left, bottom - top)):
+            if obstacle.blocks_bullets:
+                toi = obstacle.sweep_box(x0, y0, x1, y1, half, half)
+                if toi is not None and (first is None or toi < first):
+                    first = toi
+        # Comme dans sweep_bullets, le centre du projectile s'arrête au bord de l'arène
+        if not (0 < x0 < WINDOW_WIDTH and 0 < y0 < WINDOW_HEIGHT and
+                0 < x1 < WINDOW_WIDTH and 0 < y1 < WINDOW_HEIGHT):
+            for bounds in self.arena_bounds.values():
+                toi = sweep_box(x0, y0, x1, y1, 0, 0, bounds)
+                if toi is not None and (first is None or toi < first):
+                    first = toi
+        return first
+        
+    def get_bullet_polygon_id(self, obstacle):
+        if obstacle not in self.bullet_polygon_ids:
+            self.bullet_polygon_ids[obstacle] = len(self.bullet_polygon_owners)
+            self.bullet_polygon_owners.append(obstacle)
+        return self.bullet_polygon_ids[obstacle]
+        
+    def get_bullet_table(self):
+        # Table (cellule, k, [bornes, polygone]) des zones bloquantes, complétée par des zones vides ;
+        # la dernière colonne indexe le polygone exact d'un mur tourné (-1 sinon)
+        grid = self.bullet_grid
+        if self.bullet_table is not None and not grid.dirty_cells:
+            return self.bullet_table
+        
+        if self.bullet_table is None or grid.max_cell_load() > self.bullet_table.shape[1]:
+            self.bullet_table = np.empty((grid.columns * grid.rows, max(1, grid.max_cell_load()), 5))
+            dirty = [(cx, cy) for cx in range(grid.columns) for cy in range(grid.rows)]
+        else:
+            dirty = grid.dirty_cells
+            
+        for cx, cy in dirty:
+            row = self.bullet_table[cy * grid.columns + cx]
+            row[:] = (math.inf, math.inf, math.inf, math.inf, -1)
+            for k, item in enumerate(grid.cells.get((cx, cy), ())):
+                row[k, :4] = grid.item_bounds[item]
+                if getattr(item, 'polygon', None) is not None:
+                    row[k, 4] = self.get_bullet_polygon_id(item)
+        grid.dirty_cells.clear()
+        return self.bullet_table
+        
+    def sweep_bullets(self, x0, y0, x1, y1):
+        # Version vectorisée de sweep_bullet (np.inf quand il n'y a pas d'impact)
+        if len(x0) < BULLET_SWEEP_MIN_BULLETS:
+            # Pour quelques projectiles, préparer les tableaux coûte plus que la boucle
+            sweep = self.sweep_bullet
+            toi = [sweep(a, b, c, d) for a, b, c, d in zip(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist())]
+            return np.array([math.inf if t is None else t for t in toi])
+        grid = self.bullet_grid
+        travel = max(float(np.abs(x1 - x0).max()), float(np.abs(y1 - y0).max()))
+        if travel >= grid.cell_size:
+            # Trajet plus long qu'une cellule : on le découpe en tronçons plus courts
+            pieces = int(travel // grid.cell_size) + 1
+            toi = np.full(len(x0), np.inf)
+            for i in range(pieces):
+                a, b = i / pieces, (i + 1) / pieces
+                piece = self.sweep_bullets(x0 + (x1 - x0) * a, y0 + (y1 - y0) * a,
+                                           x0 + (x1 - x0) * b, y0 + (y1 - y0) * b)
+                toi = np.where(np.isinf(toi), a + piece / pieces, toi)
+            return toi
+        
+        # Un trajet plus court qu'une cellule ne touche que les cellules croisées de ses extrémités
+        table = self.get_bullet_table()
+        inv_size = 1.0 / grid.cell_size
+        columns = grid.columns
+        cx0 = np.clip((x0 * inv_size).astype(np.intp), 0, columns - 1)
+        cy0 = np.clip((y0 * inv_size).astype(np.intp), 0, grid.rows - 1)
+        cx1 = np.clip((x1 * inv_size).astype(np.intp), 0, columns - 1)
+        cy1 = np.clip((y1 * inv_size).astype(np.intp), 0, grid.rows - 1)
+        candidates = np.concatenate((table[cy0 * columns + cx0], table[cy0 * columns + cx1],
+                                     table[cy1 * columns + cx0], table[cy1 * columns + cx1]), axis=1)
+        
+        toi = sweep_boxes(x0[:, None], y0[:, None], x1[:, None], y1[:, None],
+                          candidates[:, :, 0], candidates[:, :, 1], candidates[:, :, 2], candidates[:, :, 3])
+        
+        # Test exact pour les trajets qui touchent la boîte englobante d'un mur tourné
+        polygon_ids = candidates[:, :, 4]
+        exact = np.isfinite(toi) & (polygon_ids >= 0)
+        if exact.any():
+            bullet_idx, slot_idx = np.nonzero(exact)
+            ids = polygon_ids[bullet_idx, slot_idx].astype(np.intp)
+            half = self.bullet_half_size
+            for polygon_id in np.unique(ids).tolist():
+                selected = ids == polygon_id
+                b, k = bullet_idx[selected], slot_idx[selected]
+                polygon = self.bullet_polygon_owners[polygon_id].polygon
+                if polygon is None:
+                    continue
+                toi[b, k] = polygon.sweep_boxes(x0[b], y0[b], x1[b], y1[b], half, half)
+        return toi.min(axis=1)
+        
     def get_movement_modifier(self, rect):
         dx, dy = 1.0, 1.0
-        for obstacle in self.obstacles:
-            if rect.colliderect(obstacle.rect):
+        for obstacle in self.query_rect(rect):
+            if obstacle.collides_rect(rect):
                 dx, dy = obstacle.affect_movement(dx, dy)
         return dx, dy
         
     def draw(self, screen):
         for obstacle in self.obstacles:
-            obstacle.draw(screen) 
\ No newline at end of file
+            obstacle.draw(screen)
+
+    def render_layer(self, size):
+        # Fond et obstacles composés une fois, recopiés ensuite par morceaux
+        layer = pygame.Surface(size).convert()
+        layer.fill(BLACK)
+        self.draw(layer)
+        return layer
\ No newline at end of file
@@ -1,49 +1,51 @@
 import pygame
 import math
+import struct
 from constants import *
-from character_class import CharacterClass
+from sprites import ship_sprites
 
 class Player:
-    def __init__(self, player_id, character_class, obstacle_manager):
+    # Position, direction, vie, dates du dernier tir et du bouclier, bouclier actif
+    STATE = struct.Struct("<3di3d?")
+
+    def __init__(self, player_id, character_class, obstacle_manager, projectiles, headless=False,
+                 max_bullets=None):
         self.player_id = player_id
         self.character_class = character_class
+        self.stats = character_class.stats
         self.obstacle_manager = obstacle_manager
+        self.projectiles = projectiles
+        self.max_bullets = max_bullets or self.stats.max_bullets
         
         self.x, self.y = PLAYER_START_POSITIONS[player_id]
-        self.health = self.character_class.stats['health']
+        self.prev_x, self.prev_y = self.x, self.y
+        self.health = self.stats.health
         self.rect = pygame.Rect(self.x, self.y, 
-                              self.character_class.stats['size'],
-                              self.character_class.stats['size'])
+                              self.stats.size,
+                              self.stats.size)
         
         self.direction = 0 if player_id == 0 else math.pi
         
-        self.bullets = []
-        self.last_shot_time = 0
+        # Dates sur l'horloge de simulation, qui repart de 0 à chaque match : les délais
+        # sont écoulés dès le premier pas
+        self.last_shot_time = -self.stats.shot_cooldown
         
         self.shield_active = False
         self.shield_start_time = 0
-        self.last_shield_time = 0
+        self.last_shield_time = -SHIELD_COOLDOWN
         
-        try:
-            self.original_image = pygame.image.load("assets/vaisseau.png").convert_alpha()
-            self.original_image = pygame.transform.scale(self.original_image, 
-                                                      (self.character_class.stats['size'], 
-                                                       self.character_class.stats['size']))
-            self.image = self.original_image.copy()
-            color_surface = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-            if player_id == 0:
-                color_surface.fill(BLUE)
-            else:
-                color_surface.fill(RED)
-            self.image.blit(color_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-        except Exception as e:
-            print(f"Erreur lors du chargement de l'image du vaisseau: {e}")
-            self.image = None
-            
-        if self.image:
-            self.image_rect = self.image.get_rect(center=self.rect.center)
+        self.tint = PLAYER_COLORS[player_id]
+        self.has_sprite = False
+        if not headless:
+            try:
+                ship_sprites.get_tinted(self.stats.size, self.tint)
+                self.has_sprite = True
+            except Exception as e:
+                print(f"Erreur lors du chargement de l'image du vaisseau: {e}")
+        
+    def move(self, dx, dy, step_scale=1.0):
+        self.prev_x, self.prev_y = self.x, self.y
         
-    def move(self, dx, dy):
         length = math.sqrt(dx*dx + dy*dy)
         if length > 0:
             dx = dx/length
@@ -52,7 +54,7 @@ class Player:
         
         speed_mod_x, speed_mod_y = self.obstacle_manager.get_movement_modifier(self.rect)
         
-        move_speed = self.character_class.stats.get('speed', self.character_class.stats['move_speed'])
+        move_speed = self.stats.speed * step_scale
         new_x = self.x + dx * move_speed * speed_mod_x
         new_y = self.y + dy * move_speed * speed_mod_y
         
@@ -69,61 +71,51 @@ class Player:
         self.rect.x = self.x
         self.rect.y = self.y
         
-    def shoot(self):
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_shot_time >= BULLET_COOLDOWN:
+    def shoot(self, current_time):
+        if (current_time - self.last_shot_time >= self.stats.shot_cooldown and
+                self.projectiles.count_owned(self.player_id) < self.max_bullets):
             bullet_dx = math.cos(self.direction)
             bullet_dy = math.sin(self.direction)
             
-            cannon_length = self.character_class.stats['size'] * 0.8
-            start_x = self.x + self.character_class.stats['size']/2 + bullet_dx * cannon_length
-            start_y = self.y + self.character_class.stats['size']/2 + bullet_dy * cannon_length
+            cannon_length = self.stats.cannon_length
+            start_x = self.x + self.stats.half_size + bullet_dx * cannon_length
+            start_y = self.y + self.stats.half_size + bullet_dy * cannon_length
             
-            bullet = {
-                'x': start_x,
-                'y': start_y,
-                'dx': bullet_dx,
-                'dy': bullet_dy,
-                'damage': self.character_class.stats['damage'],
-                'speed': self.character_class.stats['bullet_speed'],
-                'rect': pygame.Rect(
-                    start_x - BULLET_SIZE/2,
-                    start_y - BULLET_SIZE/2,
-                    BULLET_SIZE,
-                    BULLET_SIZE
-                )
-            }
-            
-            self.bullets.append(bullet)
+            self.projectiles.spawn(start_x, start_y, bullet_dx, bullet_dy,
+                                   self.stats.bullet_speed,
+                                   self.stats.damage,
+                                   self.player_id)
             self.last_shot_time = current_time
+            return True
+        return False
             
-    def activate_shield(self):
-        current_time = pygame.time.get_ticks()
+    def activate_shield(self, current_time):
         if not self.shield_active and current_time - self.last_shield_time >= SHIELD_COOLDOWN:
             self.shield_active = True
             self.shield_start_time = current_time
             self.last_shield_time = current_time
+            return True
+        return False
             
-    def update(self):
-        current_time = pygame.time.get_ticks()
-        
+    def update(self, current_time):
         if self.shield_active:
             if current_time - self.shield_start_time >= SHIELD_DURATION:
                 self.shield_active = False
                 
-        if hasattr(self, 'image') and self.image:
-            self.image_rect.center = self.rect.center
+    def settle(self):
+        # Fige l'interpolation sur l'état courant (simulation à l'arrêt)
+        self.prev_x, self.prev_y = self.x, self.y
                 
-        for bullet in self.bullets[:]:
-            bullet['x'] += bullet['dx'] * bullet['speed']
-            bullet['y'] += bullet['dy'] * bullet['speed']
-            bullet['rect'].x = bullet['x'] - BULLET_SIZE/2
-            bullet['rect'].y = bullet['y'] - BULLET_SIZE/2
-            
-            if (self.obstacle_manager.check_bullet_collision(bullet['rect']) or
-                bullet['x'] < 0 or bullet['x'] > WINDOW_WIDTH or
-                bullet['y'] < 0 or bullet['y'] > WINDOW_HEIGHT):
-                self.bullets.remove(bullet)
+    def pack_state(self):
+        return self.STATE.pack(self.x, self.y, self.direction, self.health, self.last_shot_time,
+                               self.shield_start_time, self.last_shield_time, self.shield_active)
+                
+    def unpack_state(self, data):
+        (self.x, self.y, self.direction, self.health, self.last_shot_time,
+         self.shield_start_time, self.last_shield_time, self.shield_active) = self.STATE.unpack(data)
+        self.prev_x, self.prev_y = self.x, self.y
+        self.rect.x = self.x
+        self.rect.y = self.y
                 
     def take_damage(self, damage):
         if not self.shield_active:
@@ -131,26 +123,28 @@ class Player:
             if self.health < 0:
                 self.health = 0
                 
-    def draw(self, screen):
-        if self.image:
-            angle_deg = -math.degrees(self.direction) + 90
-            rotated_image = pygame.transform.rotate(self.image, angle_deg)
-            rotated_rect = rotated_image.get_rect(center=self.rect.center)
-            
-            screen.blit(rotated_image, rotated_rect)
+    def draw(self, screen, alpha=1.0):
+        # Interpolation entre les deux derniers états de la simulation
+        draw_x = self.prev_x + (self.x - self.prev_x) * alpha
+        draw_y = self.prev_y + (self.y - self.prev_y) * alpha
+        draw_rect = self.rect.copy()
+        draw_rect.x = draw_x
+        draw_rect.y = draw_y
+        
+        if self.has_sprite:
+            image = ship_sprites.get(self.stats.size, self.tint, self.direction)
+            drawn = screen.blit(image, image.get_rect(center=draw_rect.center))
         else:
-            pygame.draw.rect(screen, self.character_class.stats['color'], self.rect)
+            drawn = pygame.draw.rect(screen, self.stats.color, draw_rect)
             
-            center_x = self.x + self.character_class.stats['size']/2
-            center_y = self.y + self.character_class.stats['size']/2
-            cannon_length = self.character_class.stats['size'] * 0.8
+            center_x = draw_x + self.stats.half_size
+            center_y = draw_y + self.stats.half_size
+            cannon_length = self.stats.cannon_length
             end_x = center_x + math.cos(self.direction) * cannon_length
             end_y = center_y + math.sin(self.direction) * cannon_length
-            pygame.draw.line(screen, WHITE, (center_x, center_y), (end_x, end_y), 4)
+            drawn = drawn.union(pygame.draw.line(screen, WHITE, (center_x, center_y), (end_x, end_y), 4))
         
         if self.shield_active:
-            shield_rect = self.rect.inflate(10, 10)
-            pygame.draw.rect(screen, GREEN, shield_rect, 2)
-        
-        for bullet in self.bullets:
-            pygame.draw.rect(screen, YELLOW, bullet['rect']) 
\ No newline at end of file
+            shield_rect = draw_rect.inflate(10, 10)
+            drawn = drawn.union(pygame.draw.rect(screen, GREEN, shield_rect, 2))
+        return drawn
@@ -0,0 +1,226 @@
+import os
+import json
+import pygame
+import cProfile
+import threading
+from array import array
+from datetime import datetime
+from time import perf_counter_ns
+from fonts import fonts
+from constants import *
+
+# Étapes mesurées, dans l'ordre de la boucle principale
+EVENTS, INPUT, PLAYERS, PROJECTILES, COLLISIONS, OBSTACLES, SPRITES, HUD, DISPLAY = range(9)
+FRAME = -1  # Image entière, dans les traces
+STAGE_NAMES = ("événements", "entrées", "joueurs", "projectiles", "collisions",
+               "obstacles", "vaisseaux", "HUD", "affichage")
+
+def percentile(values, fraction):
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def write_in_background(name, write):
+    # Sérialisation et écriture se font hors de la boucle principale pour ne pas la faire saccader
+    def run():
+        try:
+            os.makedirs(PROFILES_DIR, exist_ok=True)
+            path = os.path.join(PROFILES_DIR, name)
+            write(path)
+            print(f"Profil enregistré: {path}")
+        except OSError as e:
+            print(f"Impossible d'enregistrer le profil: {e}")
+    thread = threading.Thread(target=run, name="profile-writer")
+    thread.start()
+    return thread
+
+def capture_name(kind, tag, extension):
+    return f"{kind}-{tag}-{datetime.now().strftime('%Y%m%d-%H%M%S')}{extension}"
+
+def write_trace(path, spans, tag):
+    # Format « trace event » de Chrome, lisible par Perfetto et chrome://tracing
+    events = [
+        {'name': 'process_name', 'ph': 'M', 'pid': 1, 'tid': 1, 'args': {'name': GAME_TITLE}},
+        {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': 1, 'args': {'name': 'boucle principale'}}
+    ]
+    frame = 0
+    for i in range(0, len(spans), 3):
+        stage, start, end = spans[i:i + 3]
+        event = {'name': STAGE_NAMES[stage] if stage != FRAME else "image", 'cat': tag, 'ph': 'X',
+                 'ts': start / 1000, 'dur': (end - start) / 1000, 'pid': 1, 'tid': 1}
+        if stage == FRAME:
+            event['args'] = {'image': frame}
+            frame += 1
+        events.append(event)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'etat': tag}}, file)
+
+class FrameProfiler:
+    # Durées de chaque image et de chacune de ses étapes, en nanosecondes, dans un tampon
+    # circulaire préalloué. Désactivé, il ne coûte qu'un test de `enabled` par point de mesure
+    def __init__(self, capacity=PROFILER_FRAMES):
+        # Mesures actives dès que le panneau est affiché ou qu'une trace est en cours
+        self.enabled = False
+        self.visible = False
+        self.capacity = capacity
+        self.columns = len(STAGE_NAMES) + 1
+        self.samples = array('q', bytes(8 * capacity * self.columns))
+        self.current = array('q', bytes(8 * self.columns))
+        self.empty = array('q', bytes(8 * self.columns))
+        self.position = 0
+        self.count = 0
+        self.frame_start = None
+        self.frames_since_refresh = 0
+        self.panel = None
+        self.trace = None
+        self.trace_tag = None
+        self.trace_frames = 0
+        self.cprofile = None
+        self.cprofile_tag = None
+        self.cprofile_frames = 0
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.enabled = self.visible or self.trace is not None
+        self.reset()
+        return self.visible
+
+    def reset(self):
+        self.position = 0
+        self.count = 0
+        self.frame_start = None
+        self.current[:] = self.empty
+        self.panel = None
+
+    def begin_frame(self):
+        # L'image précédente est rangée avec sa durée totale, sommeil de clock.tick compris
+        if self.cprofile is not None:
+            self.cprofile_frames -= 1
+            if self.cprofile_frames <= 0:
+                self.stop_cprofile()
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        if self.frame_start is not None:
+            self.current[0] = now - self.frame_start
+            if self.trace is not None:
+                self.trace.extend((FRAME, self.frame_start, now))
+                self.trace_frames -= 1
+                if self.trace_frames <= 0:
+                    self.stop_trace()
+            start = self.position * self.columns
+            self.samples[start:start + self.columns] = self.current
+            self.position = (self.position + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+        self.current[:] = self.empty
+        self.frame_start = now
+
+    def add(self, stage, start):
+        # Renvoie la fin de l'étape, qui sert de début à la suivante
+        end = perf_counter_ns()
+        self.current[stage + 1] += end - start
+        if self.trace is not None:
+            self.trace.extend((stage, start, end))
+        return end
+
+    def start_trace(self, tag, frames=PROFILER_TRACE_FRAMES):
+        if self.trace is not None:
+            return
+        if not self.enabled:
+            self.frame_start = None
+        self.trace = array('q')
+        self.trace_tag = tag
+        self.trace_frames = frames
+        self.enabled = True
+        print(f"Enregistrement d'une trace sur {frames} images...")
+
+    def stop_trace(self):
+        if self.trace is None:
+            return None
+        spans, tag = self.trace, self.trace_tag
+        self.trace = None
+        self.enabled = self.visible
+        return write_in_background(capture_name("trace", tag, ".json"), lambda path: write_trace(path, spans, tag))
+
+    def start_cprofile(self, tag, frames=PROFILER_CPROFILE_FRAMES):
+        if self.cprofile is not None:
+            return
+        self.cprofile = cProfile.Profile()
+        self.cprofile_tag = tag
+        self.cprofile_frames = frames
+        print(f"Profilage cProfile sur {frames} images...")
+        self.cprofile.enable()
+
+    def stop_cprofile(self):
+        if self.cprofile is None:
+            return None
+        profile, tag = self.cprofile, self.cprofile_tag
+        profile.disable()
+        self.cprofile = None
+        return write_in_background(capture_name("profile", tag, ".pstats"), profile.dump_stats)
+
+    def stop_captures(self):
+        # Enregistre ce qui a déjà été capturé, par exemple à la fermeture du jeu
+        self.stop_trace()
+        self.stop_cprofile()
+
+    def column(self, index):
+        # Valeurs d'une colonne, de la plus ancienne image à la plus récente
+        first = (self.position - self.count) % self.capacity
+        return [self.samples[((first + i) % self.capacity) * self.columns + index] for i in range(self.count)]
+
+    def draw(self, screen):
+        # Le panneau n'est recomposé que toutes les PROFILER_REFRESH images
+        self.frames_since_refresh += 1
+        if self.panel is None or self.frames_since_refresh >= PROFILER_REFRESH:
+            self.frames_since_refresh = 0
+            self.panel = self.render_panel()
+        return screen.blit(self.panel, (10, 50))
+
+    def render_panel(self):
+        font = fonts.get(18)
+        line_height = font.get_linesize()
+        graph_height = 80
+        panel = pygame.Surface((360, line_height * (len(STAGE_NAMES) + 4) + graph_height + 20))
+        panel.fill((20, 20, 30))
+        pygame.draw.rect(panel, LIGHT_BLUE, panel.get_rect(), 1)
+
+        frames = self.column(0)
+        ordered = sorted(frames)
+        budget = 1e9 / FPS
+        mean = sum(frames) / len(frames) if frames else 0
+        y = 6
+        header = (f"image  p50 {percentile(ordered, 0.5) / 1e6:5.1f}  p95 {percentile(ordered, 0.95) / 1e6:5.1f}"
+                  f"  p99 {percentile(ordered, 0.99) / 1e6:5.1f}  max {percentile(ordered, 1) / 1e6:5.1f} ms")
+        panel.blit(font.render(header, True, WHITE), (8, y))
+        y += line_height
+        fps = 1e9 / mean if mean else 0
+        late = sum(1 for duration in frames if duration > budget * 1.5)
+        panel.blit(font.render(f"{fps:5.1f} images/s   {late} images en retard sur {len(frames)}", True, WHITE), (8, y))
+        y += line_height * 1.5
+
+        panel.blit(font.render("étape", True, YELLOW), (8, y))
+        panel.blit(font.render("moyenne", True, YELLOW), (170, y))
+        panel.blit(font.render("p95 (ms)", True, YELLOW), (270, y))
+        y += line_height
+        for index, name in enumerate(STAGE_NAMES, 1):
+            values = self.column(index)
+            stage_mean = sum(values) / len(values) if values else 0
+            panel.blit(font.render(name, True, WHITE), (8, y))
+            panel.blit(font.render(f"{stage_mean / 1e6:6.2f}", True, WHITE), (170, y))
+            panel.blit(font.render(f"{percentile(sorted(values), 0.95) / 1e6:6.2f}", True, WHITE), (270, y))
+            y += line_height
+
+        # Courbe des dernières images, une colonne de pixels par image ; la ligne jaune est le budget
+        graph = pygame.Rect(8, y + 6, panel.get_width() - 16, graph_height)
+        scale = graph_height / (budget * 2)
+        recent = frames[-graph.width:]
+        for x, duration in enumerate(recent, graph.right - len(recent)):
+            height = min(graph_height, int(duration * scale))
+            color = GREEN if duration <= budget * 1.5 else RED
+            pygame.draw.line(panel, color, (x, graph.bottom), (x, graph.bottom - height))
+        budget_y = graph.bottom - int(budget * scale)
+        pygame.draw.line(panel, YELLOW, (graph.left, budget_y), (graph.right, budget_y))
+        return panel
+
+profiler = FrameProfiler()
@@ -0,0 +1,287 @@
+import struct
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("NumPy non disponible - projectiles en Python pur")
+
+from constants import *
+from collision import sweep_box, sweep_boxes
+
+# Format d'un projectile dans les empreintes d'état, identique pour les deux moteurs
+BULLET_STATE = struct.Struct("<6diB?")
+# Position seule, au pixel près, pour la diffusion aux spectateurs
+BULLET_POSITION = struct.Struct("<hhB")
+if NUMPY_AVAILABLE:
+    BULLET_DTYPE = np.dtype([('x', '<f8'), ('y', '<f8'), ('prev_x', '<f8'), ('prev_y', '<f8'),
+                             ('vx', '<f8'), ('vy', '<f8'), ('damage', '<i4'), ('owner', 'u1'),
+                             ('alive', '?')])
+    POSITION_DTYPE = np.dtype([('x', '<i2'), ('y', '<i2'), ('owner', 'u1')])
+
+class ProjectileArray:
+    # Stockage en colonnes : les projectiles vivants occupent les indices [0, count)
+    FIELDS = ('x', 'y', 'prev_x', 'prev_y', 'vx', 'vy')
+    ENGINE = "NUMPY"
+
+    def __init__(self, step_scale=1.0, capacity=256):
+        self.step_scale = step_scale
+        self.capacity = capacity
+        self.count = 0
+        for field in self.FIELDS:
+            setattr(self, field, np.zeros(capacity, dtype=np.float64))
+        self.damage = np.zeros(capacity, dtype=np.int32)
+        self.owner = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        new_capacity = self.capacity * 2
+        for field in self.FIELDS + ('damage', 'owner', 'alive'):
+            old = getattr(self, field)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:self.capacity] = old
+            setattr(self, field, new)
+        self.capacity = new_capacity
+
+    def spawn(self, x, y, dx, dy, speed, damage, owner):
+        if self.count == self.capacity:
+            self._grow()
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        # Vitesse stockée directement en pixels par pas de simulation
+        self.vx[i] = dx * speed * self.step_scale
+        self.vy[i] = dy * speed * self.step_scale
+        self.damage[i] = damage
+        self.owner[i] = owner
+        self.alive[i] = True
+        self.count += 1
+
+    def count_owned(self, owner):
+        return int(np.count_nonzero(self.owner[:self.count] == owner))
+
+    def update(self, obstacle_manager):
+        # Les projectiles arrêtés au pas précédent sans passer par collide_ships sont retirés ici
+        self.compact()
+        n = self.count
+        if n == 0:
+            return
+        x, y = self.x[:n], self.y[:n]
+        prev_x, prev_y = self.prev_x[:n], self.prev_y[:n]
+        prev_x[:] = x
+        prev_y[:] = y
+        x += self.vx[:n]
+        y += self.vy[:n]
+
+        # Détection continue : un projectile rapide ne peut plus traverser un mur fin
+        toi = obstacle_manager.sweep_bullets(prev_x, prev_y, x, y)
+        blocked = np.isfinite(toi)
+        if blocked.any():
+            # Le projectile s'arrête au point d'impact ; les bords de l'arène font partie des zones bloquantes
+            t = toi[blocked]
+            x[blocked] = prev_x[blocked] + (x[blocked] - prev_x[blocked]) * t
+            y[blocked] = prev_y[blocked] + (y[blocked] - prev_y[blocked]) * t
+            self.alive[:n] &= ~blocked
+
+    def collide_ships(self, ship_rects):
+        # Chaque trajet du pas est testé contre le vaisseau adverse ; renvoie [(tireur, dégâts)]
+        n = self.count
+        if n == 0:
+            return []
+        half = BULLET_SIZE / 2
+        bounds = np.array([(r.left - half, r.top - half, r.right + half, r.bottom + half)
+                           for r in ship_rects], dtype=np.float64)
+        owner = self.owner[:n]
+        target = bounds[1 - owner]
+        toi = sweep_boxes(self.prev_x[:n], self.prev_y[:n], self.x[:n], self.y[:n],
+                          target[:, 0], target[:, 1], target[:, 2], target[:, 3])
+        hits = np.isfinite(toi)
+        result = []
+        if hits.any():
+            result = list(zip(owner[hits].tolist(), self.damage[:n][hits].tolist()))
+            self.alive[:n] &= ~hits
+        self.compact()
+        return result
+
+    def compact(self):
+        n = self.count
+        alive = self.alive[:n]
+        kept = int(np.count_nonzero(alive))
+        if kept == n:
+            return
+        for field in self.FIELDS + ('damage', 'owner'):
+            column = getattr(self, field)
+            column[:kept] = column[:n][alive]
+        self.alive[:kept] = True
+        self.alive[kept:n] = False
+        self.count = kept
+
+    def settle(self):
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def pack(self):
+        n = self.count
+        packed = np.empty(n, dtype=BULLET_DTYPE)
+        for field in BULLET_DTYPE.names:
+            packed[field] = getattr(self, field)[:n]
+        return packed.tobytes()
+
+    def pack_positions(self):
+        n = self.count
+        packed = np.empty(n, dtype=POSITION_DTYPE)
+        packed['x'] = self.x[:n]
+        packed['y'] = self.y[:n]
+        packed['owner'] = self.owner[:n]
+        return packed.tobytes()
+
+    def unpack(self, data):
+        packed = np.frombuffer(data, dtype=BULLET_DTYPE)
+        n = len(packed)
+        while self.capacity < n:
+            self._grow()
+        for field in BULLET_DTYPE.names:
+            getattr(self, field)[:n] = packed[field]
+        self.alive[n:] = False
+        self.count = n
+
+    def draw(self, screen, alpha=1.0):
+        n = self.count
+        if n == 0:
+            return []
+        half = BULLET_SIZE / 2
+        xs = (self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha - half).tolist()
+        ys = (self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha - half).tolist()
+        fill = screen.fill
+        return [fill(YELLOW, (bullet_x, bullet_y, BULLET_SIZE, BULLET_SIZE)) for bullet_x, bullet_y in zip(xs, ys)]
+
+class Bullet:
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'vx', 'vy', 'damage', 'owner', 'alive')
+
+class BulletPool:
+    # Version Python pur, choisie par create_projectile_store pour les petites capacités (ou sans
+    # NumPy). Les balles sont préallouées et recyclées, rien n'est alloué pendant le combat
+    ENGINE = "PYTHON"
+
+    def __init__(self, step_scale=1.0, capacity=DEFAULT_MAX_BULLETS * 2):
+        self.step_scale = step_scale
+        self.free = [Bullet() for _ in range(capacity)]
+        self.bullets = []
+        self.owned = [0, 0]
+
+    def __len__(self):
+        return len(self.bullets)
+
+    def spawn(self, x, y, dx, dy, speed, damage, owner):
+        bullet = self.free.pop() if self.free else Bullet()
+        bullet.x = bullet.prev_x = x
+        bullet.y = bullet.prev_y = y
+        bullet.vx = dx * speed * self.step_scale
+        bullet.vy = dy * speed * self.step_scale
+        bullet.damage = damage
+        bullet.owner = owner
+        bullet.alive = True
+        self.bullets.append(bullet)
+        self.owned[owner] += 1
+
+    def count_owned(self, owner):
+        return self.owned[owner]
+
+    def release(self, index):
+        # Retrait en O(1) : la dernière balle prend la place de celle qui disparaît
+        bullets = self.bullets
+        bullet = bullets[index]
+        last = bullets.pop()
+        if last is not bullet:
+            bullets[index] = last
+        self.owned[bullet.owner] -= 1
+        self.free.append(bullet)
+
+    def update(self, obstacle_manager):
+        bullets = self.bullets
+        i = 0
+        while i < len(bullets):
+            bullet = bullets[i]
+            if not bullet.alive:
+                self.release(i)
+                continue
+
+            bullet.prev_x, bullet.prev_y = bullet.x, bullet.y
+            bullet.x += bullet.vx
+            bullet.y += bullet.vy
+
+            # Arrêté au point d'impact, mur ou bord de l'arène : collide_ships le teste encore
+            # contre les vaisseaux avant de le libérer, comme le moteur NumPy
+            toi = obstacle_manager.sweep_bullet(bullet.prev_x, bullet.prev_y, bullet.x, bullet.y)
+            if toi is not None:
+                bullet.x = bullet.prev_x + (bullet.x - bullet.prev_x) * toi
+                bullet.y = bullet.prev_y + (bullet.y - bullet.prev_y) * toi
+                bullet.alive = False
+            i += 1
+
+    def collide_ships(self, ship_rects):
+        half = BULLET_SIZE / 2
+        targets = [(r.left, r.top, r.right, r.bottom) for r in ship_rects]
+        hits = []
+        bullets = self.bullets
+        i = 0
+        while i < len(bullets):
+            bullet = bullets[i]
+            if sweep_box(bullet.prev_x, bullet.prev_y, bullet.x, bullet.y, half, half,
+                         targets[1 - bullet.owner]) is not None:
+                hits.append((bullet.owner, bullet.damage))
+                self.release(i)
+            elif not bullet.alive:
+                self.release(i)
+            else:
+                i += 1
+        return hits
+
+    def settle(self):
+        for bullet in self.bullets:
+            bullet.prev_x, bullet.prev_y = bullet.x, bullet.y
+
+    def pack(self):
+        return b"".join(BULLET_STATE.pack(bullet.x, bullet.y, bullet.prev_x, bullet.prev_y, bullet.vx,
+                                          bullet.vy, bullet.damage, bullet.owner, bullet.alive)
+                        for bullet in self.bullets)
+
+    def pack_positions(self):
+        return b"".join(BULLET_POSITION.pack(int(bullet.x), int(bullet.y), bullet.owner)
+                        for bullet in self.bullets)
+
+    def unpack(self, data):
+        self.free.extend(self.bullets)
+        self.bullets = []
+        self.owned = [0, 0]
+        for x, y, prev_x, prev_y, vx, vy, damage, owner, alive in BULLET_STATE.iter_unpack(data):
+            bullet = self.free.pop() if self.free else Bullet()
+            bullet.x, bullet.y, bullet.prev_x, bullet.prev_y = x, y, prev_x, prev_y
+            bullet.vx, bullet.vy = vx, vy
+            bullet.damage = damage
+            bullet.owner = owner
+            bullet.alive = alive
+            self.bullets.append(bullet)
+            self.owned[owner] += 1
+
+    def draw(self, screen, alpha=1.0):
+        half = BULLET_SIZE / 2
+        drawn = []
+        for bullet in self.bullets:
+            bullet_x = bullet.prev_x + (bullet.x - bullet.prev_x) * alpha
+            bullet_y = bullet.prev_y + (bullet.y - bullet.prev_y) * alpha
+            drawn.append(screen.fill(YELLOW, (bullet_x - half, bullet_y - half, BULLET_SIZE, BULLET_SIZE)))
+        return drawn
+
+def create_projectile_store(step_scale=1.0, engine=PROJECTILE_ENGINE, capacity=DEFAULT_MAX_BULLETS * 2):
+    # NumPy ne devient rentable qu'à partir de quelques dizaines de projectiles vivants : en "AUTO",
+    # il n'est choisi que si la capacité du match (somme des limites des joueurs) permet d'en avoir
+    if engine == "AUTO":
+        engine = "NUMPY" if capacity >= PROJECTILE_NUMPY_MIN_CAPACITY else "PYTHON"
+    if engine == "NUMPY" and NUMPY_AVAILABLE:
+        return ProjectileArray(step_scale, max(256, capacity))
+    return BulletPool(step_scale, capacity)
@@ -0,0 +1,122 @@
+import os
+import json
+import zlib
+import struct
+from array import array
+from datetime import datetime
+from constants import *
+
+REPLAY_MAGIC = b"SDR1"
+REPLAY_VERSION = 1
+# Signature, version, pas par seconde, graine, pas simulés, empreinte de l'état final, taille des réglages
+HEADER = struct.Struct("<4sBHIIII")
+
+# Les axes sont quantifiés sur un octet signé, les boutons sur un octet de bits
+AXIS_SCALE = 127
+FIRE_BIT = 1
+SHIELD_BIT = 2
+
+def quantize_axis(value):
+    return max(-AXIS_SCALE, min(AXIS_SCALE, round(value * AXIS_SCALE)))
+
+def encode_input(inputs):
+    buttons = (FIRE_BIT if inputs['fire'] else 0) | (SHIELD_BIT if inputs['shield'] else 0)
+    return quantize_axis(inputs['dx']), quantize_axis(inputs['dy']), buttons
+
+def decode_input(dx, dy, buttons):
+    return {
+        'dx': dx / AXIS_SCALE,
+        'dy': dy / AXIS_SCALE,
+        'fire': bool(buttons & FIRE_BIT),
+        'shield': bool(buttons & SHIELD_BIT)
+    }
+
+class ReplayRecorder:
+    # Entrées lues par Game.step, dans l'ordre des appels, une colonne par champ
+    def __init__(self, game_settings, tick_rate, projectile_engine, seed=0):
+        self.settings = {
+            'player_classes': [game_settings['player_classes'][0], game_settings['player_classes'][1]],
+            'player_data': game_settings['player_data'],
+            'map_type': game_settings['map_type'],
+            'projectile_engine': projectile_engine,
+            'max_bullets': game_settings.get('max_bullets')
+        }
+        self.tick_rate = tick_rate
+        self.seed = seed
+        self.dx = array('b')
+        self.dy = array('b')
+        self.buttons = array('B')
+
+    def __len__(self):
+        return len(self.buttons)
+
+    def capture(self, inputs):
+        # Le jeu reçoit les entrées déjà quantifiées : la relecture lui redonne exactement les mêmes
+        dx, dy, buttons = encode_input(inputs)
+        self.dx.append(dx)
+        self.dy.append(dy)
+        self.buttons.append(buttons)
+        return decode_input(dx, dy, buttons)
+
+    def get_input(self, index):
+        return decode_input(self.dx[index], self.dy[index], self.buttons[index])
+
+    def truncate(self, length):
+        del self.dx[length:]
+        del self.dy[length:]
+        del self.buttons[length:]
+
+    def encode(self, ticks, checksum):
+        settings = json.dumps(self.settings, separators=(',', ':')).encode("utf-8")
+        header = HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.tick_rate, self.seed & 0xFFFFFFFF,
+                             ticks, checksum, len(settings))
+        inputs = self.dx.tobytes() + self.dy.tobytes() + self.buttons.tobytes()
+        return header + settings + zlib.compress(inputs, 9)
+
+class Replay:
+    def __init__(self, settings, tick_rate, seed, ticks, checksum, inputs):
+        self.settings = settings
+        self.tick_rate = tick_rate
+        self.seed = seed
+        self.ticks = ticks
+        self.checksum = checksum
+        self.inputs = inputs
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def get_input(self, index):
+        return self.inputs[index]
+
+    @staticmethod
+    def decode(data):
+        magic, version, tick_rate, seed, ticks, checksum, settings_size = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError("Format de replay inconnu")
+        offset = HEADER.size
+        settings = json.loads(data[offset:offset + settings_size].decode("utf-8"))
+        settings['player_classes'] = dict(enumerate(settings['player_classes']))
+
+        payload = zlib.decompress(data[offset + settings_size:])
+        count = len(payload) // 3
+        dx = array('b', payload[:count])
+        dy = array('b', payload[count:2 * count])
+        buttons = payload[2 * count:]
+        inputs = [decode_input(*values) for values in zip(dx, dy, buttons)]
+        return Replay(settings, tick_rate, seed, ticks, checksum, inputs)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as file:
+            return Replay.decode(file.read())
+
+def save_replay(data, directory=REPLAYS_DIR, name=None):
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, name or datetime.now().strftime("%Y%m%d-%H%M%S") + REPLAY_EXTENSION)
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+    except OSError as e:
+        print(f"Impossible d'enregistrer le replay: {e}")
+        return None
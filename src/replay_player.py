@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import argparse
+
+# Sans --realtime la relecture se fait sans fenêtre, à vitesse maximale
+if "--realtime" not in sys.argv:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from game import Game
+from replay import Replay
+from input_providers import ReplayInputProvider
+from assets import assets
+from constants import *
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Relecture d'un match enregistré")
+    parser.add_argument("replays", nargs="+", help="Fichiers de replay")
+    parser.add_argument("--realtime", action="store_true",
+                        help="Rejoue à vitesse réelle dans une fenêtre (vitesse maximale sans affichage sinon)")
+    return parser.parse_args()
+
+def play(replay, realtime=False):
+    # Re-simule le match à partir de ses réglages et de ses entrées ; renvoie None si la relecture est interrompue
+    game = Game(replay.settings, tick_rate=replay.tick_rate, headless=not realtime)
+    provider = ReplayInputProvider(replay, game)
+
+    if realtime:
+        screen = pygame.display.get_surface()
+        clock = pygame.time.Clock()
+        elapsed_ms = 0
+        while game.tick < replay.ticks:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    return None
+            steps = game.timestep.advance(elapsed_ms)
+            for _ in range(min(steps, replay.ticks - game.tick)):
+                game.step(provider)
+            pygame.display.update(game.draw(screen))
+            elapsed_ms = clock.tick(FPS)
+    else:
+        while game.tick < replay.ticks:
+            game.step(provider)
+
+    # Les matchs simulés sans affichage s'arrêtent dès la fin du combat, sans l'attente de l'écran de fin
+    if not game.return_to_menu:
+        game.finish()
+    return game
+
+def main():
+    args = parse_args()
+    if args.realtime:
+        pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption(GAME_TITLE)
+        assets.preload()
+
+    failures = 0
+    try:
+        for path in args.replays:
+            replay = Replay.load(path)
+            start = time.perf_counter()
+            game = play(replay, args.realtime)
+            if game is None:
+                break
+            elapsed = time.perf_counter() - start
+            checksum = game.checksum()
+            status = "OK" if checksum == replay.checksum and game.tick == replay.ticks else "DÉSYNCHRONISÉ"
+            if status != "OK":
+                failures += 1
+            print(f"{path}: {game.tick} pas en {elapsed:.2f} s, vainqueur {game.winner}, "
+                  f"scores {game.scores}, empreinte {checksum:08x} {status}")
+    finally:
+        pygame.quit()
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
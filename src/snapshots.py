@@ -0,0 +1,55 @@
+from bisect import bisect_right
+from collections import deque
+from constants import *
+
+class SnapshotBuffer:
+    # Sauvegardes d'état (Game.save_snapshot) prises tous les `interval` pas ; au-delà de
+    # max_bytes (ou de max_count sauvegardes) les plus anciennes sont oubliées
+    def __init__(self, interval=SNAPSHOT_INTERVAL, max_bytes=SNAPSHOT_BUFFER_BYTES, max_count=None):
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.max_count = max_count
+        self.ticks = deque()
+        self.snapshots = deque()
+        self.size = 0
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def capture(self, game):
+        if game.tick % self.interval == 0:
+            self.push(game.tick, game.save_snapshot())
+
+    def push(self, tick, data):
+        # Après un retour en arrière, les sauvegardes plus récentes ne sont plus valables
+        while self.ticks and self.ticks[-1] >= tick:
+            self.ticks.pop()
+            self.size -= len(self.snapshots.pop())
+        self.ticks.append(tick)
+        self.snapshots.append(data)
+        self.size += len(data)
+        while len(self.snapshots) > 1 and (self.size > self.max_bytes or
+                                           (self.max_count and len(self.snapshots) > self.max_count)):
+            self.ticks.popleft()
+            self.size -= len(self.snapshots.popleft())
+
+    def oldest_tick(self):
+        return self.ticks[0] if self.ticks else None
+
+    def nearest(self, tick):
+        # Dernière sauvegarde prise au plus tard à ce pas, ou None si elles sont toutes plus récentes
+        if not self.snapshots or tick < self.ticks[0]:
+            return None
+        index = bisect_right(self.ticks, tick) - 1
+        return self.ticks[index], self.snapshots[index]
+
+    def seek(self, game, tick, input_handler):
+        # Repart de la sauvegarde la plus proche puis re-simule jusqu'au pas demandé ; False si ce
+        # pas est plus ancien que toutes les sauvegardes gardées
+        nearest = self.nearest(tick)
+        if nearest is None:
+            return False
+        game.load_snapshot(nearest[1])
+        while game.tick < tick and not game.return_to_menu:
+            game.step(input_handler)
+        return True
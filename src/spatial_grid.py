@@ -0,0 +1,96 @@
+class UniformGrid:
+    # Index spatial en grille uniforme ; les zones sont des tuples (gauche, haut, droite, bas)
+    def __init__(self, cell_size, columns=None, rows=None):
+        self.cell_size = cell_size
+        self.columns = columns
+        self.rows = rows
+        self.cells = {}
+        self.item_cells = {}
+        self.item_bounds = {}
+        self.dirty_cells = set()
+
+    def cell_range(self, bounds):
+        left, top, right, bottom = bounds
+        size = self.cell_size
+        x0 = int(left // size)
+        y0 = int(top // size)
+        x1 = int(-(-right // size)) - 1
+        y1 = int(-(-bottom // size)) - 1
+        # Une grille bornée range tout ce qui dépasse dans les cellules du bord
+        if self.columns is not None:
+            x0 = min(max(x0, 0), self.columns - 1)
+            x1 = min(max(x1, 0), self.columns - 1)
+        if self.rows is not None:
+            y0 = min(max(y0, 0), self.rows - 1)
+            y1 = min(max(y1, 0), self.rows - 1)
+        return x0, y0, x1, y1
+
+    def insert(self, item, bounds):
+        cell_range = self.cell_range(bounds)
+        x0, y0, x1, y1 = cell_range
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), []).append(item)
+                self.dirty_cells.add((cx, cy))
+        self.item_cells[item] = cell_range
+        self.item_bounds[item] = bounds
+
+    def remove(self, item):
+        x0, y0, x1, y1 = self.item_cells.pop(item)
+        del self.item_bounds[item]
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self.cells[(cx, cy)]
+                cell.remove(item)
+                if not cell:
+                    del self.cells[(cx, cy)]
+                self.dirty_cells.add((cx, cy))
+
+    def update(self, item, bounds):
+        # Mise à jour incrémentale : seules les cellules quittées ou atteintes sont touchées
+        if self.cell_range(bounds) == self.item_cells.get(item):
+            self.item_bounds[item] = bounds
+            for cx, cy in self._cells_of(item):
+                self.dirty_cells.add((cx, cy))
+            return
+        if item in self.item_cells:
+            self.remove(item)
+        self.insert(item, bounds)
+
+    def _cells_of(self, item):
+        x0, y0, x1, y1 = self.item_cells[item]
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+    def query(self, bounds):
+        x0, y0, x1, y1 = self.cell_range(bounds)
+        if x0 == x1 and y0 == y1:
+            return self.cells.get((x0, y0), ())
+        return self._collect(x0, y0, x1, y1)
+
+    def query_rect(self, rect):
+        # Variante rapide pour un pygame.Rect (coordonnées entières, grille non bornée)
+        size = self.cell_size
+        x0 = rect.left // size
+        y0 = rect.top // size
+        x1 = (rect.right - 1) // size
+        y1 = (rect.bottom - 1) // size
+        if x0 == x1 and y0 == y1:
+            return self.cells.get((x0, y0), ())
+        return self._collect(x0, y0, x1, y1)
+
+    def _collect(self, x0, y0, x1, y1):
+        # Renvoie directement la liste d'une cellule quand une seule est occupée
+        cells = self.cells
+        found = ()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                items = cells.get((cx, cy))
+                if items:
+                    if not found:
+                        found = items
+                    else:
+                        found = found + [item for item in items if item not in found]
+        return found
+
+    def max_cell_load(self):
+        return max((len(items) for items in self.cells.values()), default=0)
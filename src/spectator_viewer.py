@@ -0,0 +1,79 @@
+import argparse
+import pygame
+from game import Game
+from spectators import SpectatorFeed
+from projectiles import BULLET_STATE, BULLET_POSITION
+from assets import assets
+from fonts import fonts
+from constants import *
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Écran spectateur : affiche le match diffusé par une borne")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse de la borne")
+    parser.add_argument("--port", type=int, default=SPECTATOR_PORT, help="Port de diffusion de la borne")
+    parser.add_argument("--fullscreen", action="store_true", help="Plein écran")
+    return parser.parse_args()
+
+def create_view(info):
+    # Une partie jamais simulée, qui ne sert qu'à réutiliser l'affichage du jeu
+    return Game({
+        'player_classes': dict(enumerate(info['player_classes'])),
+        'player_data': info['player_data'],
+        'map_type': info['map_type']
+    })
+
+def apply_state(game, state):
+    game.time_remaining = state['time_remaining']
+    game.game_over = state['game_over']
+    game.winner = state['winner']
+    game.damage_dealt = [{game.players[1 - i].character_class: damage} if damage else {}
+                         for i, damage in enumerate(state['damage'])]
+    for player, (x, y, direction, health, shield) in zip(game.players, state['ships']):
+        player.x = player.prev_x = x
+        player.y = player.prev_y = y
+        player.rect.x, player.rect.y = x, y
+        player.direction = direction
+        player.health = health
+        player.shield_active = shield
+    game.projectiles.unpack(b"".join(BULLET_STATE.pack(x, y, x, y, 0, 0, 0, owner, True)
+                                     for x, y, owner in BULLET_POSITION.iter_unpack(state['bullets'])))
+
+def main():
+    args = parse_args()
+    pygame.init()
+    flags = pygame.FULLSCREEN if args.fullscreen else 0
+    screen = pygame.display.set_mode((0, 0) if args.fullscreen else (WINDOW_WIDTH, WINDOW_HEIGHT), flags)
+    pygame.display.set_caption(f"{GAME_TITLE} - spectateur")
+    assets.preload()
+
+    feed = SpectatorFeed((args.host, args.port))
+    clock = pygame.time.Clock()
+    game = None
+    info = None
+    try:
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    return
+
+            received = feed.receive()
+            if received:
+                if received[0] != info:
+                    info = received[0]
+                    game = create_view(info)
+                apply_state(game, received[1])
+
+            if game:
+                pygame.display.update(game.draw(screen))
+            else:
+                screen.fill(BLACK)
+                waiting = fonts.render("En attente du match...", FONT_SIZE_MEDIUM, WHITE)
+                screen.blit(waiting, waiting.get_rect(center=screen.get_rect().center))
+                pygame.display.flip()
+            clock.tick(FPS)
+    finally:
+        feed.close()
+        pygame.quit()
+
+if __name__ == "__main__":
+    main()
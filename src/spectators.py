@@ -0,0 +1,196 @@
+import json
+import time
+import zlib
+import socket
+import struct
+from projectiles import BULLET_POSITION
+from constants import *
+
+SPECTATOR_MAGIC = b"SV"
+# Signature, type, pas, pas de l'image clé de référence
+HEADER = struct.Struct("<2sBII")
+SUBSCRIBE = 1
+KEYFRAME = 2
+DELTA = 3
+PACKET_SIZE = 8192
+
+# Temps restant (ms), fin de partie, vainqueur, dégâts infligés par chaque joueur
+MATCH_STATE = struct.Struct("<I?b2H")
+# Position, direction (dix-millièmes de radian), vie, bouclier
+SHIP_STATE = struct.Struct("<3hh?")
+BULLET_COUNT = struct.Struct("<H")
+INFO_SIZE = struct.Struct("<H")
+
+def pack_state(game):
+    damage = [sum(game.damage_dealt[i].values()) for i in range(2)]
+    parts = [MATCH_STATE.pack(int(game.time_remaining), game.game_over,
+                              -2 if game.winner is None else game.winner, *damage)]
+    for player in game.players:
+        parts.append(SHIP_STATE.pack(int(player.x), int(player.y), int(player.direction * 10000),
+                                     player.health, player.shield_active))
+    parts.append(BULLET_COUNT.pack(len(game.projectiles)))
+    parts.append(game.projectiles.pack_positions())
+    return b"".join(parts)
+
+def xor_bytes(data, reference):
+    # Octets identiques à l'image clé -> zéros, que zlib réduit à presque rien
+    reference = reference[:len(data)].ljust(len(data), b"\0")
+    return (int.from_bytes(data, "little") ^ int.from_bytes(reference, "little")).to_bytes(len(data), "little")
+
+class SpectatorPublisher:
+    # Diffuse l'état du match à chaque pas. Les spectateurs s'abonnent en envoyant SUBSCRIBE (à
+    # renouveler) ; chaque image est construite une seule fois puis envoyée à tous. Une image clé
+    # complète part régulièrement, les autres ne contiennent que l'écart avec elle : une image
+    # perdue ne gêne pas les suivantes
+    def __init__(self, address=(SPECTATOR_HOST, SPECTATOR_PORT), keyframe_interval=SPECTATOR_KEYFRAME_INTERVAL,
+                 timeout=SPECTATOR_TIMEOUT, clock=time.monotonic):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.bind(address)
+        self.keyframe_interval = keyframe_interval
+        self.timeout = timeout
+        self.clock = clock
+        self.subscribers = {}
+        self.game = None
+        self.info = b""
+        self.key_tick = None
+        self.key_state = b""
+        self.last_sweep = clock()
+
+    def poll(self):
+        now = self.clock()
+        while True:
+            try:
+                data, address = self.sock.recvfrom(64)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                continue
+            if data[:2] == SPECTATOR_MAGIC and data[2:3] == bytes((SUBSCRIBE,)):
+                if address not in self.subscribers:
+                    # Un nouveau spectateur reçoit tout de suite une image clé
+                    self.key_tick = None
+                self.subscribers[address] = now
+        if now - self.last_sweep > 1:
+            self.last_sweep = now
+            for address in [address for address, seen in self.subscribers.items() if now - seen > self.timeout]:
+                del self.subscribers[address]
+
+    def publish(self, game):
+        self.poll()
+        if not self.subscribers:
+            return
+        if game is not self.game:
+            self.game = game
+            self.key_tick = None
+            self.info = json.dumps({
+                'player_classes': [game.game_settings['player_classes'][0], game.game_settings['player_classes'][1]],
+                'player_data': [{'name': data['name']} for data in game.player_data],
+                'map_type': game.game_settings['map_type']
+            }).encode("utf-8")
+
+        state = pack_state(game)
+        if self.key_tick is None or game.tick - self.key_tick >= self.keyframe_interval or game.tick < self.key_tick:
+            self.key_tick = game.tick
+            self.key_state = state
+            packet = (HEADER.pack(SPECTATOR_MAGIC, KEYFRAME, game.tick, game.tick) +
+                      zlib.compress(INFO_SIZE.pack(len(self.info)) + self.info + state, 1))
+        else:
+            packet = (HEADER.pack(SPECTATOR_MAGIC, DELTA, game.tick, self.key_tick) +
+                      zlib.compress(xor_bytes(state, self.key_state), 1))
+
+        sendto = self.sock.sendto
+        for address in self.subscribers:
+            try:
+                sendto(packet, address)
+            except OSError:
+                pass
+
+    def close(self):
+        self.sock.close()
+
+class SpectatorFeed:
+    # Côté spectateur : reconstruit les états à partir des images reçues
+    def __init__(self, address=(SPECTATOR_HOST, SPECTATOR_PORT)):
+        self.address = address
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.info = None
+        self.key_tick = None
+        self.key_state = None
+        self.tick = -1
+        self.last_subscribe = None
+
+    def subscribe(self, now):
+        if self.last_subscribe is None or now - self.last_subscribe >= SPECTATOR_TIMEOUT / 3:
+            self.last_subscribe = now
+            try:
+                self.sock.sendto(SPECTATOR_MAGIC + bytes((SUBSCRIBE,)), self.address)
+            except OSError:
+                pass
+
+    def receive(self):
+        # Renvoie (infos du match, état décodé par unpack_state) le plus récent reçu, ou None
+        self.subscribe(time.monotonic())
+        latest = None
+        while True:
+            try:
+                data, _ = self.sock.recvfrom(PACKET_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                continue
+            if len(data) < HEADER.size or data[:2] != SPECTATOR_MAGIC:
+                continue
+            _, kind, tick, key_tick = HEADER.unpack_from(data)
+            # Image en retard, sauf une image clé qui repart de zéro : c'est un nouveau match
+            if tick < self.tick and not (kind == KEYFRAME and self.tick - tick > SIMULATION_HZ):
+                continue
+            try:
+                payload = zlib.decompress(data[HEADER.size:])
+                if kind == KEYFRAME:
+                    info_size = INFO_SIZE.unpack_from(payload)[0]
+                    info = json.loads(payload[INFO_SIZE.size:INFO_SIZE.size + info_size].decode("utf-8"))
+                    key_state = payload[INFO_SIZE.size + info_size:]
+                    state = unpack_state(key_state)
+                    self.info = info
+                    self.key_tick = key_tick
+                    self.key_state = key_state
+                elif kind == DELTA and key_tick == self.key_tick:
+                    state = unpack_state(xor_bytes(payload, self.key_state))
+                else:
+                    # Image clé de référence manquée : on attend la suivante
+                    continue
+            except (zlib.error, struct.error, ValueError):
+                # Paquet tronqué ou corrompu : ignoré. Une image clé perdue ainsi n'est pas retenue,
+                # ses écarts sont donc ignorés aussi jusqu'à la suivante
+                continue
+            self.tick = tick
+            latest = state
+        if latest is None:
+            return None
+        return self.info, latest
+
+    def close(self):
+        self.sock.close()
+
+def unpack_state(state):
+    time_remaining, game_over, winner, damage1, damage2 = MATCH_STATE.unpack_from(state)
+    offset = MATCH_STATE.size
+    ships = []
+    for _ in range(2):
+        x, y, direction, health, shield = SHIP_STATE.unpack_from(state, offset)
+        ships.append((x, y, direction / 10000, health, shield))
+        offset += SHIP_STATE.size
+    count = BULLET_COUNT.unpack_from(state, offset)[0]
+    offset += BULLET_COUNT.size
+    if len(state) != offset + count * BULLET_POSITION.size:
+        raise struct.error("état tronqué")
+    return {
+        'time_remaining': time_remaining,
+        'game_over': game_over,
+        'winner': None if winner == -2 else winner,
+        'damage': (damage1, damage2),
+        'ships': ships,
+        'bullets': state[offset:offset + count * BULLET_POSITION.size]
+    }
@@ -0,0 +1,58 @@
+import math
+import pygame
+from collections import OrderedDict
+from constants import *
+from assets import assets, surface_bytes
+
+class SpriteCache:
+    # Sprites teintés et pivotés, partagés entre les joueurs et d'un match à l'autre
+    def __init__(self, path, angle_steps=SHIP_ANGLE_STEPS, max_bytes=SHIP_SPRITE_CACHE_BYTES):
+        self.path = path
+        self.angle_steps = angle_steps
+        self.max_bytes = max_bytes
+        self.tinted = {}
+        self.rotated = OrderedDict()
+        self.used_bytes = 0
+
+    def get_tinted(self, size, tint):
+        key = (size, tint)
+        image = self.tinted.get(key)
+        if image is None:
+            image = assets.get_scaled(self.path, (size, size)).copy()
+            color_surface = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+            color_surface.fill(tint)
+            image.blit(color_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            self.tinted[key] = image
+        return image
+
+    def quantize(self, direction):
+        return round(direction / (2 * math.pi) * self.angle_steps) % self.angle_steps
+
+    def get(self, size, tint, direction):
+        key = (size, tint, self.quantize(direction))
+        image = self.rotated.get(key)
+        if image is not None:
+            self.rotated.move_to_end(key)
+            return image
+
+        angle_deg = -math.degrees(key[2] * 2 * math.pi / self.angle_steps) + 90
+        image = pygame.transform.rotate(self.get_tinted(size, tint), angle_deg)
+        self.rotated[key] = image
+        self.used_bytes += surface_bytes(image)
+
+        # Les angles les moins récemment affichés sont oubliés au-delà du budget mémoire
+        while self.used_bytes > self.max_bytes and len(self.rotated) > 1:
+            _, old = self.rotated.popitem(last=False)
+            self.used_bytes -= surface_bytes(old)
+        return image
+
+    def precompute(self, size, tint):
+        for step in range(self.angle_steps):
+            self.get(size, tint, step * 2 * math.pi / self.angle_steps)
+
+    def clear(self):
+        self.tinted.clear()
+        self.rotated.clear()
+        self.used_bytes = 0
+
+ship_sprites = SpriteCache("assets/vaisseau.png")
@@ -0,0 +1,93 @@
+import sys
+import zlib
+import struct
+from array import array
+from collections import namedtuple
+from constants import *
+
+# Types d'événements enregistrés pendant un match
+SHOT = 0
+HIT = 1
+SHIELD = 2
+EVENT_NAMES = {SHOT: "TIR", HIT: "TOUCHE", SHIELD: "BOUCLIER"}
+
+TELEMETRY_MAGIC = b"SDT1"
+TELEMETRY_VERSION = 1
+HEADER = struct.Struct("<4sBI")
+
+# Une colonne par champ ; le tick est stocké en écart avec l'événement précédent
+COLUMNS = (('tick', 'I'), ('kind', 'B'), ('player', 'B'), ('x', 'h'), ('y', 'h'), ('value', 'h'))
+
+TelemetryEvent = namedtuple('TelemetryEvent', [name for name, _ in COLUMNS])
+
+class TelemetryRecorder:
+    # Tampons préalloués : enregistrer un événement n'alloue rien tant que la capacité suffit
+    def __init__(self, capacity=TELEMETRY_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.columns = []
+        for _, typecode in COLUMNS:
+            column = array(typecode)
+            column.frombytes(bytes(column.itemsize * capacity))
+            self.columns.append(column)
+
+    def __len__(self):
+        return self.count
+
+    def record(self, tick, kind, player, x, y, value=0):
+        if self.count == self.capacity:
+            self.grow()
+        i = self.count
+        ticks, kinds, players, xs, ys, values = self.columns
+        ticks[i] = tick
+        kinds[i] = kind
+        players[i] = player
+        xs[i] = int(x)
+        ys[i] = int(y)
+        values[i] = value
+        self.count += 1
+
+    def truncate(self, count):
+        # Oublie les événements d'une partie de la simulation qui a été rejouée
+        self.count = min(self.count, count)
+
+    def grow(self):
+        for column in self.columns:
+            column.frombytes(bytes(column.itemsize * self.capacity))
+        self.capacity *= 2
+
+    def encode(self):
+        # Colonnes mises bout à bout puis compressées : les valeurs proches se suivent
+        n = self.count
+        parts = []
+        for (name, typecode), column in zip(COLUMNS, self.columns):
+            values = column[:n]
+            if name == 'tick':
+                values = array(typecode, [values[i] - (values[i - 1] if i else 0) for i in range(n)])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            parts.append(values.tobytes())
+        return HEADER.pack(TELEMETRY_MAGIC, TELEMETRY_VERSION, n) + zlib.compress(b"".join(parts), 9)
+
+def read_events(blob):
+    # Relit un bloc encodé événement par événement
+    magic, version, n = HEADER.unpack_from(blob)
+    if magic != TELEMETRY_MAGIC or version != TELEMETRY_VERSION:
+        raise ValueError("Format de télémétrie inconnu")
+    payload = zlib.decompress(blob[HEADER.size:])
+
+    columns = []
+    offset = 0
+    for name, typecode in COLUMNS:
+        values = array(typecode)
+        size = values.itemsize * n
+        values.frombytes(payload[offset:offset + size])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        offset += size
+        columns.append(values)
+
+    tick = 0
+    for delta, kind, player, x, y, value in zip(*columns):
+        tick += delta
+        yield TelemetryEvent(tick, kind, player, x, y, value)
@@ -0,0 +1,29 @@
+from constants import *
+
+class FixedTimestep:
+    def __init__(self, tick_rate=SIMULATION_HZ, max_steps=MAX_CATCH_UP_STEPS):
+        self.tick_rate = tick_rate
+        self.step_ms = 1000 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, elapsed_ms):
+        # Accumule le temps écoulé et renvoie le nombre de pas à simuler
+        self.accumulator += elapsed_ms
+        steps = int(self.accumulator // self.step_ms)
+
+        if self.max_steps is not None and steps > self.max_steps:
+            # Trop de retard : on abandonne le surplus plutôt que de geler l'affichage
+            steps = self.max_steps
+            self.accumulator %= self.step_ms
+        else:
+            self.accumulator -= steps * self.step_ms
+        return steps
+
+    @property
+    def alpha(self):
+        # Fraction du pas suivant déjà écoulée, pour l'interpolation du rendu
+        return min(1.0, self.accumulator / self.step_ms)
+
+    def reset(self):
+        self.accumulator = 0.0
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Les modules du jeu s'importent à plat depuis src/, sans fenêtre ni son
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,17 @@
+import pytest
+from character_class import CharacterClass, ClassStats
+
+def test_stats_are_immutable():
+    stats = CharacterClass('SCOUT').stats
+    assert stats.half_size == stats.size / 2
+    assert stats.cannon_length == stats.size * 0.8
+    with pytest.raises(AttributeError):
+        stats.health = 1000
+
+def test_registry_only_changes_through_register():
+    classes = CharacterClass.get_classes()
+    with pytest.raises(TypeError):
+        classes['CHEAT'] = CharacterClass('SCOUT').stats
+    with pytest.raises(ValueError):
+        CharacterClass.register('SCOUT', ClassStats.create('Scout', 1, 1, 1, 1, (0, 0, 0), '', 10))
+    assert 'CHEAT' not in CharacterClass.get_classes()
@@ -0,0 +1,35 @@
+from database import Database
+
+def test_cache_invalidated_before_write_returns(tmp_path):
+    db = Database(tmp_path / "game.db")
+    try:
+        # Met en cache la liste vide avant l'écriture
+        assert db.get_all_players() == []
+        seen = []
+        future = db.submit(lambda cursor: db.write_player(cursor, "alice"))
+        # Appelé par le thread d'écriture au moment où l'appelant est réveillé
+        future.add_done_callback(lambda _: seen.append(dict(db.query_cache)))
+        player_id = future.result()
+        db.flush()
+        assert seen == [{}]
+        assert db.get_all_players() == [(player_id, "alice")]
+        assert db.get_player(player_id)[1] == "alice"
+    finally:
+        db.close()
+
+def test_bulk_telemetry_attached_to_its_match(tmp_path):
+    db = Database(tmp_path / "game.db")
+    try:
+        players = [db.add_player("alice"), db.add_player("bob")]
+        matches = [{
+            'player1_id': players[0], 'player2_id': players[1], 'player1_score': i, 'player2_score': 0,
+            'winner_id': players[0], 'player1_class': 'SCOUT', 'player2_class': 'TANK', 'duration': i,
+            'telemetry': str(i).encode() if i % 3 else None
+        } for i in range(10)]
+        assert db.save_matches(matches).result() == 10
+        rows = db.get_connection().execute('SELECT id, duration FROM matches ORDER BY id').fetchall()
+        assert [duration for _, duration in rows] == list(range(10))
+        for match_id, duration in rows:
+            assert db.get_telemetry(match_id) == (str(duration).encode() if duration % 3 else None)
+    finally:
+        db.close()
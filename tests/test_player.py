@@ -0,0 +1,27 @@
+from game import Game
+
+SETTINGS = {
+    'map_type': 'CLASSIC',
+    'player_classes': {0: 'SNIPER', 1: 'SCOUT'},
+    'player_data': [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]
+}
+
+class FireAndShield:
+    def get_player_input(self, player_id):
+        return {'dx': 0, 'dy': 0, 'fire': True, 'shield': True}
+
+def test_shield_and_fire_on_first_tick():
+    game = Game(SETTINGS, headless=True)
+    game.step(FireAndShield())
+    assert game.tick == 1
+    for player in game.players:
+        assert player.shield_active
+        assert player.last_shot_time == game.sim_time
+    assert len(game.projectiles) == 2
+
+def test_mode_bullet_cap_overrides_class():
+    game = Game({**SETTINGS, 'max_bullets': 3}, headless=True)
+    for _ in range(40):
+        game.step(FireAndShield())
+    assert [player.max_bullets for player in game.players] == [3, 3]
+    assert max(game.projectiles.count_owned(i) for i in range(2)) <= 3
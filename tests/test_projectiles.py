@@ -0,0 +1,47 @@
+import pygame
+import pytest
+from constants import *
+from obstacle import ObstacleManager
+from projectiles import BulletPool, ProjectileArray, NUMPY_AVAILABLE, BULLET_POSITION, create_projectile_store
+
+ENGINES = [BulletPool] + ([ProjectileArray] if NUMPY_AVAILABLE else [])
+
+def empty_arena():
+    manager = ObstacleManager()
+    manager.obstacles = []
+    manager.build_index()
+    return manager
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_bullet_hits_ship_across_arena_border(engine):
+    # Le vaisseau visé dépasse du bord droit ; le projectile sort de l'arène pendant le pas
+    projectiles = engine()
+    projectiles.spawn(WINDOW_WIDTH - 5, 100, 1, 0, 20, BULLET_DAMAGE, 0)
+    ships = [pygame.Rect(0, 0, 10, 10), pygame.Rect(WINDOW_WIDTH - 2, 85, 30, 30)]
+    projectiles.update(empty_arena())
+    assert projectiles.collide_ships(ships) == [(0, BULLET_DAMAGE)]
+    assert len(projectiles) == 0
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_bullet_stops_at_arena_border(engine):
+    projectiles = engine()
+    projectiles.spawn(WINDOW_WIDTH - 5, 100, 1, 0, 20, BULLET_DAMAGE, 0)
+    projectiles.update(empty_arena())
+    assert BULLET_POSITION.unpack(projectiles.pack_positions()) == (WINDOW_WIDTH, 100, 0)
+    assert projectiles.collide_ships([pygame.Rect(0, 0, 10, 10)] * 2) == []
+    assert len(projectiles) == 0
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_bullet_spawned_outside_arena_is_stopped(engine):
+    # Tiré par un vaisseau qui dépasse du bord bas : le projectile ne rentre pas dans l'arène
+    projectiles = engine()
+    projectiles.spawn(300, WINDOW_HEIGHT + 10, 0, -1, 20, BULLET_DAMAGE, 0)
+    projectiles.update(empty_arena())
+    assert BULLET_POSITION.unpack(projectiles.pack_positions()) == (300, WINDOW_HEIGHT + 10, 0)
+    assert projectiles.collide_ships([pygame.Rect(0, 0, 10, 10)] * 2) == []
+    assert len(projectiles) == 0
+
+def test_auto_engine_follows_capacity():
+    assert isinstance(create_projectile_store(1.0, "AUTO", PROJECTILE_NUMPY_MIN_CAPACITY - 1), BulletPool)
+    large = create_projectile_store(1.0, "AUTO", PROJECTILE_NUMPY_MIN_CAPACITY)
+    assert isinstance(large, ProjectileArray if NUMPY_AVAILABLE else BulletPool)
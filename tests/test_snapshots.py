@@ -0,0 +1,34 @@
+from game import Game
+from snapshots import SnapshotBuffer
+from instant_replay import InstantReplay
+from input_providers import RandomInputProvider
+
+SETTINGS = {
+    'map_type': 'CLASSIC',
+    'player_classes': {0: 'SNIPER', 1: 'SCOUT'},
+    'player_data': [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]
+}
+
+def recorded_game(ticks, **buffer):
+    game = Game(SETTINGS, headless=True)
+    game.start_recording()
+    game.snapshots = SnapshotBuffer(**buffer)
+    game.snapshots.capture(game)
+    provider = RandomInputProvider(1, game)
+    while game.tick < ticks:
+        game.step(provider)
+    return game
+
+def test_seek_before_oldest_snapshot_fails():
+    game = recorded_game(300, interval=60, max_count=2)
+    assert game.snapshots.oldest_tick() == 240
+    assert game.snapshots.nearest(100) is None
+    other = Game(SETTINGS, headless=True)
+    assert not game.snapshots.seek(other, 100, RandomInputProvider(1, other))
+    assert game.snapshots.nearest(250)[0] == 240
+
+def test_instant_replay_starts_at_oldest_snapshot():
+    game = recorded_game(600, interval=60, max_count=3)
+    highlight = InstantReplay(game, seconds=60)
+    assert not highlight.done
+    assert highlight.game.tick == game.snapshots.oldest_tick() == 480
@@ -0,0 +1,53 @@
+import json
+import zlib
+import socket
+import time
+from spectators import (SpectatorFeed, HEADER, SPECTATOR_MAGIC, KEYFRAME, DELTA, INFO_SIZE,
+                        MATCH_STATE, SHIP_STATE, BULLET_COUNT, xor_bytes)
+
+INFO = json.dumps({'player_classes': ['SNIPER', 'SCOUT'], 'player_data': [{'name': 'a'}, {'name': 'b'}],
+                   'map_type': 'CLASSIC'}).encode("utf-8")
+
+def make_state(time_remaining):
+    return (MATCH_STATE.pack(time_remaining, False, -2, 0, 0) + SHIP_STATE.pack(10, 20, 0, 100, False) +
+            SHIP_STATE.pack(30, 40, 0, 100, False) + BULLET_COUNT.pack(0))
+
+def keyframe(tick, state):
+    return HEADER.pack(SPECTATOR_MAGIC, KEYFRAME, tick, tick) + zlib.compress(INFO_SIZE.pack(len(INFO)) + INFO + state)
+
+def delta(tick, key_tick, state, key_state):
+    return HEADER.pack(SPECTATOR_MAGIC, DELTA, tick, key_tick) + zlib.compress(xor_bytes(state, key_state))
+
+def receive(feed, attempts=100):
+    for _ in range(attempts):
+        received = feed.receive()
+        if received:
+            return received
+        time.sleep(0.01)
+    return None
+
+def test_corrupt_packets_are_dropped():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    feed = SpectatorFeed(server.getsockname())
+    try:
+        feed.receive()
+        _, address = server.recvfrom(64)
+        key_state = make_state(60000)
+        server.sendto(keyframe(1, key_state)[:-4], address)
+        server.sendto(HEADER.pack(SPECTATOR_MAGIC, DELTA, 2, 1) + b"\x00garbage", address)
+        server.sendto(HEADER.pack(SPECTATOR_MAGIC, KEYFRAME, 3, 3) + zlib.compress(b"\x05"), address)
+        server.sendto(keyframe(4, key_state[:-3]), address)
+        assert receive(feed, 10) is None
+        # Les écarts d'une image clé jamais reçue sont ignorés jusqu'à la suivante
+        server.sendto(delta(5, 4, make_state(59000), key_state), address)
+        assert receive(feed, 10) is None
+        server.sendto(keyframe(6, key_state), address)
+        server.sendto(delta(7, 6, make_state(59000), key_state), address)
+        info, state = receive(feed)
+        assert info['map_type'] == 'CLASSIC'
+        assert state['time_remaining'] == 59000
+        assert state['ships'][1][:2] == (30, 40)
+    finally:
+        feed.close()
+        server.close()